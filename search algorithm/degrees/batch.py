@@ -0,0 +1,246 @@
+"""
+Batch query mode for degrees.
+
+Reads tab-separated "source name<TAB>target name" pairs from a file or
+stdin, optionally followed by "<TAB>source birth<TAB>target birth" years
+that --policy birth uses to pick between people sharing a name, and
+writes one JSON object per query to stdout:
+
+    {"query": 0, "source": "...", "target": "...",
+     "degrees": 2, "path": [[movie_id, person_id], ...]}
+
+Unresolvable names or unconnected pairs produce an "error" field instead
+of "degrees"/"path". Pairs are answered as they are read, so results
+stream out while the input is still arriving and memory stays bounded.
+Each query is a shortest_path search until the time spent on one
+source adds up to the cost of a full distances_from tree; that source
+then gets a tree, kept in a small LRU, which answers its later queries
+without searching. With --workers the queries go to single-process
+pools chosen by source, so each source's tree lives in one worker, and
+the workers inherit the loaded graph.
+
+Usage: python batch.py [directory] [pairs_file] [--workers N]
+                       [--policy most_movies|birth]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import degrees
+from workerpool import process_pool
+
+# distances_from trees kept per process; each costs 12 bytes per person
+TREE_CACHE_SIZE = 8
+# assumed cost of one tree in seconds until the first is built
+TREE_SECONDS = 0.5
+# sources whose search time is tracked
+SPENT_SIZE = 4096
+# queries submitted to each worker ahead of its results
+PENDING_PER_WORKER = 8
+
+_emit_lock = threading.Lock()
+# SourceTrees of a worker process, see answer_in_worker
+_worker_trees = None
+
+
+def read_pairs(stream):
+    """
+    Yields (source_name, target_name, source_birth, target_birth) from
+    tab-separated lines, skipping blank lines. The two birth-year columns
+    are optional hints for --policy birth; missing or non-numeric hints
+    are None.
+    """
+    for line in stream:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        fields = [field.strip() for field in line.split("\t")]
+        fields += [""] * (4 - len(fields))
+        source, target, source_birth, target_birth = fields[:4]
+        yield source, target, _year(source_birth), _year(target_birth)
+
+
+def _year(value):
+    return int(value) if value.isascii() and value.isdigit() else None
+
+
+class SourceTrees():
+    """
+    Answers queries one at a time, deciding per source whether a
+    distances_from tree pays for itself. A tree costs a full BFS, while a
+    bidirectional search is usually far cheaper, so a source is answered
+    with shortest_path until the time spent on its searches reaches the
+    cost of a tree; then its tree is built and kept in a small LRU.
+    """
+
+    def __init__(self, capacity=TREE_CACHE_SIZE, tree_seconds=TREE_SECONDS):
+        self.capacity = capacity
+        # source -> SearchTree, least recently used first
+        self.trees = OrderedDict()
+        # source -> seconds spent searching from it without a tree
+        self.spent = OrderedDict()
+        # cost of building one tree, remeasured on every build
+        self.tree_seconds = tree_seconds
+
+    def path(self, source, target):
+        """
+        Returns the (movie_id, person_id) path from source to target, or
+        None if they are not connected.
+        """
+        tree = self.trees.get(source)
+        if tree is not None:
+            self.trees.move_to_end(source)
+            return tree.path_to(target)
+
+        spent = self.spent.pop(source, 0.0)
+        if spent >= self.tree_seconds:
+            start = time.perf_counter()
+            tree = degrees.distances_from(source)
+            self.tree_seconds = time.perf_counter() - start
+            self.trees[source] = tree
+            if len(self.trees) > self.capacity:
+                self.trees.popitem(last=False)
+            return tree.path_to(target)
+
+        start = time.perf_counter()
+        try:
+            path = degrees.shortest_path(source, target)
+        except Exception as e:
+            if e.args != ("no solution",):
+                raise
+            path = None
+        self.spent[source] = spent + time.perf_counter() - start
+        if len(self.spent) > SPENT_SIZE:
+            self.spent.popitem(last=False)
+        return path
+
+
+def answer(trees, query):
+    """
+    Answers one (index, source_name, target_name, source, target) query
+    with a SourceTrees, returning the JSON-ready result dict.
+    """
+    index, source_name, target_name, source, target = query
+    result = {"query": index, "source": source_name, "target": target_name}
+    path = trees.path(source, target)
+    if path is None:
+        result["error"] = "not connected"
+    else:
+        result["degrees"] = len(path)
+        result["path"] = [list(step) for step in path]
+    return result
+
+
+def answer_in_worker(query):
+    """
+    answer() against the worker process's own SourceTrees.
+    """
+    global _worker_trees
+    if _worker_trees is None:
+        _worker_trees = SourceTrees()
+    return answer(_worker_trees, query)
+
+
+def run(pairs, directory, out, workers=1, policy=None):
+    """
+    Resolves and answers the pairs as they are read, streaming JSON lines
+    to `out`. Data must already be loaded with degrees.load_data(directory).
+    Ambiguous names are settled by `policy` (see degrees.disambiguate)
+    or reported as errors when it is None.
+
+    With several workers, results are written as each query finishes, so
+    lines may come out of order; "query" holds the input position.
+    """
+    queries = _resolve(pairs, out, policy)
+    if workers <= 1:
+        trees = SourceTrees()
+        for query in queries:
+            _emit(out, answer(trees, query))
+        return
+
+    # one process per pool, picked by source, keeps each source's tree
+    # in a single worker
+    pools = [process_pool(directory, 1) for _ in range(workers)]
+    # bounds how far reading may run ahead of the workers
+    slots = threading.BoundedSemaphore(workers * PENDING_PER_WORKER)
+    errors = []
+
+    def finished(future):
+        try:
+            _emit(out, future.result())
+        except Exception as e:
+            errors.append(e)
+        finally:
+            slots.release()
+
+    try:
+        for query in queries:
+            if errors:
+                break
+            slots.acquire()
+            pool = pools[hash(query[3]) % workers]
+            pool.submit(answer_in_worker, query).add_done_callback(finished)
+    finally:
+        for pool in pools:
+            pool.shutdown()
+    if errors:
+        raise errors[0]
+
+
+def _resolve(pairs, out, policy):
+    """
+    Yields (index, source_name, target_name, source, target) for every
+    pair whose names resolve, writing an error line for the rest. Pairs
+    may carry source and target birth hints after the two names.
+    """
+    for index, (source_name, target_name, *hints) in enumerate(pairs):
+        source_birth, target_birth = (list(hints) + [None, None])[:2]
+        source = degrees.person_id_for_name(
+            source_name, interactive=False, policy=policy, birth=source_birth)
+        target = degrees.person_id_for_name(
+            target_name, interactive=False, policy=policy, birth=target_birth)
+        if source is None or target is None:
+            missing = source_name if source is None else target_name
+            _emit(out, {"query": index, "source": source_name,
+                        "target": target_name,
+                        "error": f"person not found or ambiguous: {missing}"})
+            continue
+        yield index, source_name, target_name, source, target
+
+
+def _emit(out, result):
+    # worker results are written from the pools' callback threads
+    with _emit_lock:
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch degrees queries.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("pairs", nargs="?", default="-",
+                        help="tab-separated name pairs, '-' for stdin")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--policy", choices=("most_movies", "birth"),
+                        help="resolve ambiguous names instead of failing; "
+                             "birth uses the optional third and fourth "
+                             "columns as source and target birth years")
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory, engine="csr")
+
+    if args.pairs == "-":
+        run(read_pairs(sys.stdin), args.directory, sys.stdout,
+            args.workers, args.policy)
+    else:
+        with open(args.pairs, encoding="utf-8") as f:
+            run(read_pairs(f), args.directory, sys.stdout,
+                args.workers, args.policy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark harness for degrees on synthetic scale-free datasets.
+
+Generates people/movies/stars CSVs with a power-law cast size per movie
+and preferential attachment when picking the cast (so a few prolific
+actors appear in many movies), then measures load time, peak RSS and
+shortest_path latency over random pairs. Results are written as a
+single JSON object so they can be tracked across versions.
+
+Usage: python bench.py [--people N] [--movies N] [--queries N]
+                       [--engine dict|csr|stream] [--out results.json]
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+
+import degrees
+from latency import latency_ms
+
+
+def generate(directory, people=10000, movies=5000, seed=0,
+             exponent=2.5, min_cast=3, max_cast=200):
+    """
+    Writes people.csv, movies.csv and stars.csv into `directory`.
+
+    Cast sizes follow a discrete power law with the given exponent,
+    starting at min_cast and truncated at max_cast. Each cast slot goes
+    to a person with probability proportional to their credits so far
+    plus one.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("id", "name", "birth"))
+        for person in range(people):
+            writer.writerow((person + 1, f"Person {person + 1}",
+                             rng.randint(1920, 2005)))
+
+    with open(os.path.join(directory, "movies.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("id", "title", "year"))
+        for movie in range(movies):
+            writer.writerow((movie + 1, f"Movie {movie + 1}",
+                             rng.randint(1930, 2020)))
+
+    # every credit appended here makes that person more likely to be
+    # picked again: preferential attachment without tracking weights
+    credits = list(range(people))
+    with open(os.path.join(directory, "stars.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("person_id", "movie_id"))
+        for movie in range(movies):
+            size = min(max_cast,
+                       min_cast - 1 + int(rng.paretovariate(exponent - 1)))
+            cast = set()
+            while len(cast) < min(size, people):
+                cast.add(rng.choice(credits))
+            for person in cast:
+                writer.writerow((person + 1, movie + 1))
+                credits.append(person)
+
+
+def peak_rss_kb():
+    """
+    Returns this process's peak resident set size in KiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run(directory, queries=1000, engine="dict", seed=0):
+    """
+    Loads `directory` with the given engine and times random queries.
+    Returns the result dict.
+    """
+    rss_before = peak_rss_kb()
+    start = time.perf_counter()
+    degrees.load_data(directory, engine=engine, use_snapshot=False)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = peak_rss_kb()
+
+    data = degrees.movie_graph.data
+    person_ids = data.graph.person_ids
+    rng = random.Random(seed)
+
+    latencies = []
+    connected = 0
+    for _ in range(queries):
+        source = person_ids[rng.randrange(len(person_ids))]
+        target = person_ids[rng.randrange(len(person_ids))]
+        start = time.perf_counter()
+        try:
+            data.shortest_path(source, target, use_cache=False)
+            connected += 1
+        except Exception:
+            pass
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    return {
+        "engine": engine,
+        "people": len(person_ids),
+        "movies": len(data.graph.movie_ids),
+        "edges": len(data.graph.person_movies),
+        "load_seconds": load_seconds,
+        "peak_rss_kb_before_load": rss_before,
+        "peak_rss_kb_after_load": rss_loaded,
+        "peak_rss_kb": peak_rss_kb(),
+        "queries": queries,
+        "connected": connected,
+        "latency_p50_ms": latency_ms(latencies, 0.50),
+        "latency_p99_ms": latency_ms(latencies, 0.99),
+        "latency_max_ms": latency_ms(latencies, 1.0),
+        "python": platform.python_version(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees.")
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--engine", choices=("dict", "csr", "stream"),
+                        default="dict")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", help="reuse or keep generated CSVs here")
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = args.data or scratch
+        if not os.path.exists(os.path.join(directory, "stars.csv")):
+            generate(directory, args.people, args.movies, args.seed)
+        result = run(directory, args.queries, args.engine, args.seed)
+        result["dataset"] = {"people": args.people, "movies": args.movies,
+                             "seed": args.seed}
+
+    output = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
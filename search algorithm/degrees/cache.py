@@ -0,0 +1,122 @@
+"""
+Bounded LRU cache of shortest_path results.
+
+Paths are undirected, so (a, b) and (b, a) share one entry: the path is
+stored in the orientation of its sorted key and reversed on the way out
+when the lookup runs the other way. "Not connected" results are cached
+as NOT_CONNECTED.
+"""
+
+import threading
+from collections import OrderedDict
+
+NOT_CONNECTED = object()
+
+
+class PathCache():
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, source, target):
+        """
+        Returns the cached path from source to target, NOT_CONNECTED,
+        or None on a miss. Paths are fresh lists the caller may change.
+        """
+        key, flipped = _key(source, target)
+        with self.lock:
+            path = self.entries.get(key)
+            if path is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        if path is NOT_CONNECTED:
+            return path
+        # the stored list is shared by every thread: hand out a copy
+        if not flipped:
+            return list(path)
+        return reverse_path(path, target)
+
+    def put(self, source, target, path):
+        """
+        Stores a path (or NOT_CONNECTED) found from source to target.
+        """
+        if self.capacity <= 0:
+            return
+        key, flipped = _key(source, target)
+        if flipped and path is not NOT_CONNECTED:
+            path = reverse_path(path, source)
+        elif path is not NOT_CONNECTED:
+            # keep our own copy, so later changes to the caller's list
+            # cannot reach the entry
+            path = list(path)
+        with self.lock:
+            self.entries[key] = path
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, capacity):
+        """
+        Changes the capacity, evicting least recently used entries.
+        """
+        with self.lock:
+            self.capacity = capacity
+            while len(self.entries) > max(capacity, 0):
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def carry_over(self, keep):
+        """
+        Returns a new cache with the same capacity holding only the entries
+        whose (source, target) key satisfies keep(source, target), in the
+        same recency order. Counters start from zero.
+        """
+        cache = PathCache(self.capacity)
+        with self.lock:
+            for key, path in self.entries.items():
+                if keep(*key):
+                    cache.entries[key] = path
+        return cache
+
+    def clear(self):
+        """
+        Drops every entry and resets the counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Returns the hit/miss/eviction counters and current size.
+        """
+        with self.lock:
+            return {
+                "capacity": self.capacity,
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def reverse_path(path, source):
+    """
+    Reverses a (movie_id, person_id) path that starts at `source`,
+    giving the path from its last person back to `source`.
+    """
+    people = [source] + [person for _, person in path]
+    return [(path[i][0], people[i]) for i in range(len(path) - 1, -1, -1)]
+
+
+def _key(source, target):
+    if source <= target:
+        return (source, target), False
+    return (target, source), True
@@ -0,0 +1,120 @@
+"""
+Load-test client for the degrees query server.
+
+Opens a number of keep-alive connections to a running server.py and
+sends /path queries for random pairs of person ids taken from the same
+dataset, then reports throughput, latency percentiles and the count of
+each response status as one JSON object.
+
+Usage: python client.py [directory] [--host H] [--port N]
+                        [--requests N] [--concurrency N] [--seed N]
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import time
+from urllib.parse import urlencode
+
+from latency import latency_ms
+
+
+def read_person_ids(directory):
+    """
+    Returns every person id in the dataset's people.csv.
+    """
+    with open(os.path.join(directory, "people.csv"),
+              encoding="utf-8") as f:
+        return [row["id"] for row in csv.DictReader(f)]
+
+
+async def request(reader, writer, host, path):
+    """
+    Sends one GET on an open keep-alive connection and returns
+    (status, decoded JSON body).
+    """
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n"
+                 .encode("latin-1"))
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    lines = head.split("\r\n")
+    status = int(lines[0].split()[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    body = await reader.readexactly(length)
+    return status, json.loads(body)
+
+
+async def worker(host, port, queries, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while queries:
+            source, target = queries.pop()
+            path = "/path?" + urlencode(
+                {"source": source, "target": target, "by": "id"})
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, host, path)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(host, port, person_ids, requests=1000, concurrency=16,
+              seed=0):
+    """
+    Sends `requests` random queries over `concurrency` connections and
+    returns the result dict.
+    """
+    rng = random.Random(seed)
+    queries = [(rng.choice(person_ids), rng.choice(person_ids))
+               for _ in range(requests)]
+    latencies = []
+    statuses = {}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(host, port, queries, latencies, statuses)
+        for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed if elapsed else None,
+        "latency_p50_ms": latency_ms(latencies, 0.50),
+        "latency_p90_ms": latency_ms(latencies, 0.90),
+        "latency_p99_ms": latency_ms(latencies, 0.99),
+        "latency_max_ms": latency_ms(latencies, 1.0),
+        "statuses": {str(status): count
+                     for status, count in sorted(statuses.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test server.py.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    person_ids = read_person_ids(args.directory)
+    result = asyncio.run(run(args.host, args.port, person_ids,
+                             args.requests, args.concurrency, args.seed))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
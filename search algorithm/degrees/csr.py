@@ -0,0 +1,678 @@
+"""
+Compact integer-indexed graph engine for the degrees dataset.
+
+People and movies are interned to dense ints and the person-movie
+bipartite graph is stored as two compressed sparse row (CSR) tables:
+
+    person_offsets[p] .. person_offsets[p + 1]  -> slice of person_movies
+    movie_offsets[m]  .. movie_offsets[m + 1]   -> slice of movie_people
+
+All tables are flat `array`s of machine ints, so the whole graph costs a
+few bytes per edge instead of a Python set entry per edge.
+"""
+
+import csv
+import heapq
+import os
+from array import array
+
+from tables import csv_columns, read_ids
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised when a search expands more people than its budget allows.
+    """
+
+
+class CSRGraph():
+    def __init__(self, person_ids, movie_ids,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 person_index=None, movie_index=None, components=None):
+        # index -> original string id
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        # original string id -> index; built from the id lists unless a
+        # more compact mapping is supplied
+        if person_index is None:
+            person_index = {pid: i for i, pid in enumerate(person_ids)}
+        if movie_index is None:
+            movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        # person index -> connected component label, see label_components
+        self.components = components
+
+    @classmethod
+    def from_edges(cls, person_ids, movie_ids, edges,
+                   person_index=None, movie_index=None):
+        """
+        Builds the graph from id lists and an iterable of
+        (person_index, movie_index) int pairs.
+        """
+        person_side = array("i")
+        movie_side = array("i")
+        for p, m in edges:
+            person_side.append(p)
+            movie_side.append(m)
+        return cls.from_arrays(person_ids, movie_ids, person_side, movie_side,
+                               person_index, movie_index)
+
+    @classmethod
+    def from_arrays(cls, person_ids, movie_ids, person_side, movie_side,
+                    person_index=None, movie_index=None, unique=False):
+        """
+        Builds the graph from two parallel int arrays holding the
+        person and movie index of every edge. With unique=True repeated
+        edges are dropped.
+        """
+        person_offsets, person_movies = _compress(
+            len(person_ids), person_side, movie_side)
+        if unique:
+            person_offsets, person_movies = _unique_rows(person_offsets,
+                                                         person_movies)
+            person_side = _row_indexes(person_offsets)
+            movie_side = person_movies
+        movie_offsets, movie_people = _compress(
+            len(movie_ids), movie_side, person_side)
+        return cls(person_ids, movie_ids,
+                   person_offsets, person_movies, movie_offsets, movie_people,
+                   person_index, movie_index)
+
+    @classmethod
+    def from_indexes(cls, people, movies):
+        """
+        Builds the graph from the `people` / `movies` dicts
+        filled in by degrees.load_data.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        person_index = {pid: i for i, pid in enumerate(person_ids)}
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        edges = (
+            (person_index[pid], movie_index[mid])
+            for pid, person in people.items()
+            for mid in person["movies"]
+        )
+        return cls.from_edges(person_ids, movie_ids, edges)
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Builds the graph straight from the CSV files, reading only the id
+        columns and never materialising the per-person dicts. Ids are
+        kept compact (see tables.read_ids) and repeated star rows dropped.
+        """
+        person_ids, person_index = read_ids(
+            os.path.join(directory, "people.csv"))
+        movie_ids, movie_index = read_ids(
+            os.path.join(directory, "movies.csv"))
+
+        person_side = array("i")
+        movie_side = array("i")
+        with open(os.path.join(directory, "stars.csv"), encoding="utf-8") as f:
+            reader = csv.reader(f)
+            columns = csv_columns(next(reader), ("person_id", "movie_id"))
+            for row in reader:
+                person = person_index.get(row[columns[0]])
+                movie = movie_index.get(row[columns[1]])
+                if person is None or movie is None:
+                    continue
+                person_side.append(person)
+                movie_side.append(movie)
+
+        return cls.from_arrays(person_ids, movie_ids, person_side, movie_side,
+                               person_index, movie_index, unique=True)
+
+    def extend(self, person_ids, movie_ids, edges):
+        """
+        Returns a new graph with `person_ids` / `movie_ids` appended and the
+        (person_index, movie_index) `edges` added. Existing indexes keep
+        their meaning, and component labels are merged incrementally
+        instead of being recomputed. This graph is left untouched.
+        """
+        edges = list(edges)
+        new_person_ids, new_person_index = _extend_ids(
+            self.person_ids, self.person_index, person_ids)
+        new_movie_ids, new_movie_index = _extend_ids(
+            self.movie_ids, self.movie_index, movie_ids)
+
+        # existing edges, rebuilt from the person-side table
+        person_side = _row_indexes(self.person_offsets)
+        movie_side = array("i", self.person_movies)
+        for person, movie in edges:
+            person_side.append(person)
+            movie_side.append(movie)
+
+        graph = CSRGraph.from_arrays(new_person_ids, new_movie_ids,
+                                     person_side, movie_side,
+                                     new_person_index, new_movie_index)
+        if self.components is not None:
+            graph.components = self._merge_components(graph, edges)
+        return graph
+
+    def _merge_components(self, graph, edges):
+        """
+        Derives the component labels of `graph` (this graph plus `edges`)
+        from this graph's labels with a union-find over labels.
+        """
+        labels = array("i", self.components)
+        next_label = max(labels) + 1 if labels else 0
+        for _ in range(len(graph.person_ids) - len(labels)):
+            labels.append(next_label)
+            next_label += 1
+
+        parent = list(range(next_label))
+
+        def find(label):
+            while parent[label] != label:
+                parent[label] = parent[parent[label]]
+                label = parent[label]
+            return label
+
+        # everyone in a movie's cast ends up in one component, so joining
+        # each new credit to the first cast member is enough
+        merged = False
+        for person, movie in edges:
+            root = find(labels[person])
+            first = graph.movie_people[graph.movie_offsets[movie]]
+            other_root = find(labels[first])
+            if other_root != root:
+                parent[other_root] = root
+                merged = True
+        if not merged and len(labels) == len(self.components):
+            return labels
+
+        # renumber in order of first appearance, as label_components does
+        renumber = {}
+        for person, label in enumerate(labels):
+            root = find(label)
+            if root not in renumber:
+                renumber[root] = len(renumber)
+            labels[person] = renumber[root]
+        return labels
+
+    def movies_for(self, person):
+        """
+        Returns the slice of movie indexes the person starred in.
+        """
+        offsets = self.person_offsets
+        return self.person_movies[offsets[person]:offsets[person + 1]]
+
+    def stars_for(self, movie):
+        """
+        Returns the slice of person indexes that starred in the movie.
+        """
+        offsets = self.movie_offsets
+        return self.movie_people[offsets[movie]:offsets[movie + 1]]
+
+    def neighbors(self, person, allowed=None):
+        """
+        Yields (movie_index, person_index) pairs for people who starred
+        with the given person, walking the CSR tables in place.
+
+        `allowed` is an optional movie mask (see GraphData.movie_filter);
+        movies whose byte is 0 are skipped.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            if allowed is not None and not allowed[movie]:
+                continue
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+
+    def shortest_path(self, source, target, allowed=None, budget=None):
+        """
+        Bidirectional BFS between two person indexes. Returns the shortest
+        list of (movie_index, person_index) pairs, or None if unconnected.
+        With a movie mask in `allowed` only those movies are used as links.
+        With a `budget`, raises BudgetExceeded once more than that many
+        people have been expanded.
+        """
+        if source == target:
+            return []
+        if not self.connected(source, target):
+            return None
+
+        # person index -> (movie index, neighbour one step closer to root)
+        forward = {source: None}
+        backward = {target: None}
+        forward_layer = [source]
+        backward_layer = [target]
+        expanded = 0
+
+        while forward_layer and backward_layer:
+            expand_forward = len(forward_layer) <= len(backward_layer)
+            if expand_forward:
+                layer, visited, other = forward_layer, forward, backward
+            else:
+                layer, visited, other = backward_layer, backward, forward
+
+            if budget is not None:
+                expanded += len(layer)
+                if expanded > budget:
+                    raise BudgetExceeded(f"expanded more than {budget} people")
+
+            next_layer = []
+            for state in layer:
+                for movie, neighbor in self.neighbors(state, allowed):
+                    if neighbor in visited:
+                        continue
+                    visited[neighbor] = (movie, state)
+                    next_layer.append(neighbor)
+                    if neighbor in other:
+                        return join_paths(forward, backward, neighbor)
+
+            if expand_forward:
+                forward_layer = next_layer
+            else:
+                backward_layer = next_layer
+
+        return None
+
+    def distances_from(self, source, max_depth=None, allowed=None):
+        """
+        Runs a single-source BFS from a person index, optionally stopping
+        after max_depth degrees, and returns the resulting SearchTree.
+        With a movie mask in `allowed` only those movies are used as links.
+
+        Each movie's cast is expanded at most once: the first time a movie
+        is reached every co-star gets their final distance, so later visits
+        could not improve anything.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        size = len(self.person_ids)
+        distance = array("i", [-1]) * size
+        parent = array("i", [-1]) * size
+        via = array("i", [-1]) * size
+        if allowed is None:
+            expanded = bytearray(len(self.movie_ids))
+        else:
+            # masked-out movies count as already expanded
+            expanded = bytearray(1 - flag for flag in allowed)
+
+        distance[source] = 0
+        layer = [source]
+        depth = 0
+        while layer and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_layer = []
+            for state in layer:
+                for i in range(person_offsets[state],
+                               person_offsets[state + 1]):
+                    movie = person_movies[i]
+                    if expanded[movie]:
+                        continue
+                    expanded[movie] = 1
+                    for j in range(movie_offsets[movie],
+                                   movie_offsets[movie + 1]):
+                        neighbor = movie_people[j]
+                        if distance[neighbor] != -1:
+                            continue
+                        distance[neighbor] = depth
+                        parent[neighbor] = state
+                        via[neighbor] = movie
+                        next_layer.append(neighbor)
+            layer = next_layer
+
+        return SearchTree(self, source, distance, parent, via)
+
+    def nearest(self, source, targets, count=1):
+        """
+        Runs one BFS from source towards a set of target person indexes and
+        returns up to `count` (target, path) pairs, closest first. The search
+        stops as soon as enough targets have been reached.
+        """
+        targets = {target for target in targets
+                   if self.connected(source, target)}
+        found = []
+        if not targets:
+            return found
+        if source in targets:
+            found.append((source, []))
+            if len(found) >= count:
+                return found
+
+        # person index -> (movie index, parent person index)
+        parents = {source: None}
+        layer = [source]
+        while layer and len(found) < count:
+            next_layer = []
+            for state in layer:
+                for movie, neighbor in self.neighbors(state):
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = (movie, state)
+                    next_layer.append(neighbor)
+                    if neighbor in targets:
+                        found.append((neighbor, _trace(parents, neighbor)))
+                        if len(found) >= count:
+                            return found
+            layer = next_layer
+        return found
+
+    def k_shortest_paths(self, source, target, k):
+        """
+        Returns up to k shortest simple paths from source to target as
+        lists of (movie_index, person_index) pairs, shortest first.
+
+        Paths are distinct by the sequence of people they pass through;
+        between two consecutive people the first shared movie is used.
+        One BFS from the target gives the exact distance of every person
+        to it, which then guides a best-first enumeration of partial paths
+        ordered by length so far plus remaining distance. No further
+        searches are run per path.
+        """
+        if not self.connected(source, target):
+            return []
+        remaining = self.distances_from(target).distance
+
+        paths = []
+        counter = 0
+        heap = [(remaining[source], counter, source, ())]
+        while heap and len(paths) < k:
+            _, _, state, path = heapq.heappop(heap)
+            if state == target:
+                paths.append(list(path))
+                continue
+
+            on_path = {source}
+            on_path.update(person for _, person in path)
+            seen = set()
+            for movie, neighbor in self.neighbors(state):
+                if neighbor in seen or neighbor in on_path:
+                    continue
+                seen.add(neighbor)
+                if remaining[neighbor] == -1:
+                    continue
+                counter += 1
+                heapq.heappush(heap, (
+                    len(path) + 1 + remaining[neighbor], counter,
+                    neighbor, path + ((movie, neighbor),)))
+        return paths
+
+    def label_components(self):
+        """
+        Labels every person with the id of its connected component
+        (numbered 0, 1, ... in order of the lowest person index), stores
+        the labels in `components` and returns them. Each movie's cast is
+        scanned once, so this is linear in the number of edges.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        labels = array("i", [-1]) * len(self.person_ids)
+        movie_seen = bytearray(len(self.movie_ids))
+        label = 0
+        for start in range(len(labels)):
+            if labels[start] != -1:
+                continue
+            labels[start] = label
+            stack = [start]
+            while stack:
+                person = stack.pop()
+                for i in range(person_offsets[person],
+                               person_offsets[person + 1]):
+                    movie = person_movies[i]
+                    if movie_seen[movie]:
+                        continue
+                    movie_seen[movie] = 1
+                    for j in range(movie_offsets[movie],
+                                   movie_offsets[movie + 1]):
+                        other = movie_people[j]
+                        if labels[other] == -1:
+                            labels[other] = label
+                            stack.append(other)
+            label += 1
+
+        self.components = labels
+        return labels
+
+    def connected(self, source, target):
+        """
+        Returns whether two person indexes share a connected component,
+        labelling the components first if needed.
+        """
+        components = self.components
+        if components is None:
+            components = self.label_components()
+        return components[source] == components[target]
+
+    def component_sizes(self):
+        """
+        Returns a list of component sizes indexed by component label.
+        """
+        components = self.components
+        if components is None:
+            components = self.label_components()
+        sizes = []
+        for label in components:
+            if label >= len(sizes):
+                sizes.extend([0] * (label + 1 - len(sizes)))
+            sizes[label] += 1
+        return sizes
+
+    def to_ids(self, path):
+        """
+        Converts a path of (movie_index, person_index) pairs
+        back to (movie_id, person_id) pairs.
+        """
+        return [(self.movie_ids[m], self.person_ids[p]) for m, p in path]
+
+
+class SearchTree():
+    """
+    Result of CSRGraph.distances_from. Three arrays indexed by person:
+
+        distance[p]  degrees from the source, -1 if not reached
+        parent[p]    previous person on a shortest path, -1 at the root
+        via[p]       movie shared with parent[p], -1 at the root
+
+    Methods taking or returning ids translate through the graph.
+    """
+
+    def __init__(self, graph, source, distance, parent, via):
+        self.graph = graph
+        self.source = source
+        self.distance = distance
+        self.parent = parent
+        self.via = via
+
+    def distance_to(self, person_id):
+        """
+        Returns the degrees of separation to person_id, or None.
+        """
+        distance = self.distance[self.graph.person_index[person_id]]
+        return None if distance == -1 else distance
+
+    def path_to(self, person_id):
+        """
+        Returns the (movie_id, person_id) path from the source to
+        person_id, or None if it was not reached.
+        """
+        path = self.index_path(self.graph.person_index[person_id])
+        return None if path is None else self.graph.to_ids(path)
+
+    def index_path(self, target):
+        """
+        Returns the (movie_index, person_index) path to a person index.
+        """
+        if self.distance[target] == -1:
+            return None
+        path = []
+        while target != self.source:
+            path.append((self.via[target], target))
+            target = self.parent[target]
+        path.reverse()
+        return path
+
+    def within(self, depth):
+        """
+        Yields the ids of everyone at most `depth` degrees from the source.
+        """
+        person_ids = self.graph.person_ids
+        for index, distance in enumerate(self.distance):
+            if 0 <= distance <= depth:
+                yield person_ids[index]
+
+
+class ExtendedIds():
+    """
+    Sequence of ids made of a base sequence followed by appended ids.
+    """
+
+    def __init__(self, base, extra):
+        self.base = base
+        self.extra = extra
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def __getitem__(self, index):
+        if index < len(self.base):
+            return self.base[index]
+        return self.extra[index - len(self.base)]
+
+    def __iter__(self):
+        yield from self.base
+        yield from self.extra
+
+
+class ExtendedIndex():
+    """
+    id -> index mapping made of a base mapping plus appended ids.
+    """
+
+    def __init__(self, base, extra):
+        self.base = base
+        self.extra = extra
+
+    def __getitem__(self, key):
+        index = self.get(key)
+        if index is None:
+            raise KeyError(key)
+        return index
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        index = self.base.get(key)
+        if index is None:
+            index = self.extra.get(key, default)
+        return index
+
+
+def _extend_ids(ids, index, new_ids):
+    """
+    Appends new ids after the existing ones, returning new (ids, index)
+    objects and leaving the originals untouched.
+    """
+    if not new_ids:
+        return ids, index
+    if isinstance(ids, list) and isinstance(index, dict):
+        ids = ids + list(new_ids)
+        index = dict(index)
+        for i in range(len(ids) - len(new_ids), len(ids)):
+            index[ids[i]] = i
+        return ids, index
+    # compact id views (see tables.py): layer the new ids on top
+    extra = list(new_ids)
+    extra_index = {key: len(ids) + i for i, key in enumerate(extra)}
+    if isinstance(ids, ExtendedIds):
+        extra = ids.extra + extra
+        extra_index.update(index.extra)
+        ids, index = ids.base, index.base
+    return ExtendedIds(ids, extra), ExtendedIndex(index, extra_index)
+
+
+def _compress(size, rows, cols):
+    """
+    Groups `cols` by `rows` into CSR form, returning (offsets, values).
+    """
+    offsets = array("q", bytes(8 * (size + 1)))
+    for r in rows:
+        offsets[r + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    values = array("i", bytes(4 * len(cols)))
+    cursor = array("q", offsets[:-1])
+    for r, c in zip(rows, cols):
+        values[cursor[r]] = c
+        cursor[r] += 1
+    return offsets, values
+
+
+def _unique_rows(offsets, values):
+    """
+    Drops repeated values within each CSR row, keeping the first of each,
+    and returns the new (offsets, values).
+    """
+    new_offsets = array("q", [0])
+    new_values = array("i")
+    for row in range(len(offsets) - 1):
+        new_values.extend(dict.fromkeys(values[offsets[row]:offsets[row + 1]]))
+        new_offsets.append(len(new_values))
+    return new_offsets, new_values
+
+
+def _row_indexes(offsets):
+    """
+    Returns the row index of every value in a CSR table.
+    """
+    rows = array("i")
+    for row in range(len(offsets) - 1):
+        rows.extend([row] * (offsets[row + 1] - offsets[row]))
+    return rows
+
+
+def _trace(parents, target):
+    """
+    Follows a parent map back from target to build its path.
+    """
+    path = []
+    state = target
+    while parents[state] is not None:
+        movie, parent = parents[state]
+        path.append((movie, state))
+        state = parent
+    path.reverse()
+    return path
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Stitches the two half-paths of a bidirectional search that meet at
+    `meeting` into one source -> target list of (movie, person) pairs.
+    `forward` and `backward` map each person to the (movie, person) link
+    towards their own root, or None at the root.
+    """
+    solution = []
+    state = meeting
+    while forward[state] is not None:
+        movie, parent = forward[state]
+        solution.append((movie, state))
+        state = parent
+    solution.reverse()
+
+    state = meeting
+    while backward[state] is not None:
+        movie, child = backward[state]
+        solution.append((movie, child))
+        state = child
+    return solution
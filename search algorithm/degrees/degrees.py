@@ -1,7 +1,9 @@
-import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from moviegraph import MovieGraph
+
+# Graph used by the module-level functions below; load it with load_data
+movie_graph = MovieGraph()
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,44 +14,73 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# LRU cache of shortest_path results; resize with resize_cache(n)
+path_cache = None
+
 
-def load_data(directory):
+def load_data(directory, engine="dict", use_snapshot=True,
+              cache_capacity=None, metadata_path=None):
     """
     Load data from CSV files into memory.
+
+    Loads (or atomically reloads) `movie_graph`; see GraphData.load for
+    the engine, snapshot and metadata_path options. `names`, `people` and `movies` are
+    rebound to the loaded dataset's dicts, which stay empty with the csr
+    and stream engines, and `path_cache` to its cache. The cache keeps
+    its current capacity unless `cache_capacity` is given (1024 on the
+    first load).
+    """
+    if cache_capacity is None:
+        cache_capacity = (path_cache.capacity if path_cache is not None
+                          else 1024)
+    _rebind(movie_graph.load(directory, engine, use_snapshot, cache_capacity,
+                             metadata_path))
+
+
+def reload_data():
+    """
+    Reloads the last loaded directory with the same options and cache
+    capacity.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    _rebind(movie_graph.reload())
+
+
+def apply_updates(people=(), movies=(), stars=()):
+    """
+    Adds (id, name, birth) people, (id, title, year) movies and
+    (person_id, movie_id) star rows to the loaded data without a reload.
+    """
+    _rebind(movie_graph.apply_updates(people, movies, stars))
+
+
+def apply_delta(directory):
+    """
+    Applies the people.csv / movies.csv / stars.csv in a delta directory
+    to the loaded data without a reload.
+    """
+    _rebind(movie_graph.apply_delta(directory))
+
+
+def resize_cache(capacity):
+    """
+    Changes the shortest_path cache capacity, evicting least recently used
+    entries. It is kept across updates and reloads.
+    """
+    movie_graph.resize_cache(capacity)
+
+
+def cache_stats():
+    """
+    Returns hits, misses, evictions, size and capacity of the
+    shortest_path cache.
+    """
+    return movie_graph.cache_stats()
+
+
+def _rebind(data):
+    global names, people, movies, path_cache
+    names, people, movies = data.names, data.people, data.movies
+    path_cache = data.path_cache
 
 
 def main():
@@ -69,7 +100,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target) if connected(source, target) else None
 
     if path is None:
         print("Not connected.")
@@ -78,113 +109,102 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_info(path[i][1])["name"]
+            person2 = person_info(path[i + 1][1])["name"]
+            movie = movie_info(path[i + 1][0])["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=True, use_cache=True,
+                  years=None, exclude=(), predicate=None, budget=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
-    If no possible path, returns None.
-    """
+    See GraphData.shortest_path for the search, cache and budget options,
+    and GraphData.movie_filter for the years/exclude/predicate filters.
 
+    If no possible path, raises Exception("no solution").
     """
-    initial state
-    queue Frontier: Source
-    Explored Set:
+    return movie_graph.shortest_path(
+        source, target, bidirectional, use_cache,
+        years=years, exclude=exclude, predicate=predicate, budget=budget)
+
 
-    queue Frontier: All neighbors of source
-    Explored Set: Source
-    
-    While True:
-        
-        if frontier is empty:
-            no path exists
-            
-        remove node
-        
-        else if removed node.state == target :
-            if node is equal to target we have our solution
-            
-        else if removed node.state not in explored:
-            remove node from queue Frontier and into explored
-            Add neighbors of the removed frontier into queue Frontier
-            
+def connected(source, target):
+    """
+    Returns whether two people are connected at all, answered in O(1)
+    from the precomputed component labels.
+    """
+    return movie_graph.connected(source, target)
 
-    Keep checking for target
 
+def distances_from(person_id, max_depth=None,
+                   years=None, exclude=(), predicate=None):
+    """
+    Runs one BFS from person_id and returns a SearchTree; see
+    GraphData.distances_from.
     """
+    return movie_graph.distances_from(
+        person_id, max_depth,
+        years=years, exclude=exclude, predicate=predicate)
+
 
-    explored = set()
-    frontier = QueueFrontier()
-    source = Node(state=source, parent=None, action=None)
-    frontier.add(source)
+def build_landmarks(count=200):
+    """
+    Builds the landmark index used by estimate_degrees.
+    """
+    return movie_graph.build_landmarks(count)
 
-    while True:
 
-        # if frontier is empty, then we have no path
-        if frontier.empty():
-            raise Exception("no solution")
+def estimate_degrees(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two people from the landmark index, without searching.
+    """
+    return movie_graph.estimate_degrees(source, target)
 
-        node = frontier.remove()
 
-        # mark node as explored
-        explored.add(node.state)
+def nearest_targets(source, targets, count=1):
+    """
+    Returns up to `count` (person_id, path) pairs for the targets closest
+    to source, found with a single shared BFS.
+    """
+    return movie_graph.nearest_targets(source, targets, count)
 
-        # if node is equal to target we have our solution
-        if node.state == target:
-            print("Found path")
-            print("Preparing path......")
-            # return solution
-            actions = []
-            cells = []
-            solution = []
-            while node.parent is not None:
-                actions.append(node.action)
-                cells.append(node.state)
-                node = node.parent
-            actions.reverse()
-            cells.reverse()
-            for x, y in zip(actions, cells):
-                solution.append((x, y))
-            return solution
 
-        #add the nodes of the removed node to the frontier
-        neighbors = neighbors_for_person(node.state)
-        for action, state in neighbors:
-            if not frontier.contains_state(state) and state not in explored:
-                child = Node(state=state, parent=node, action=action)
-                frontier.add(child)
+def k_shortest_paths(source, target, k):
+    """
+    Returns up to k distinct shortest (movie_id, person_id) paths
+    between two people, shortest first.
+    """
+    return movie_graph.k_shortest_paths(source, target, k)
 
 
-def person_id_for_name(name):
+def person_id_for_name(name, interactive=True, policy=None, birth=None,
+                       max_distance=0):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    See GraphData.person_id_for_name for the policy and fuzzy options.
     """
-    person_ids = list(names.get(name.lower(), set()))
-    if len(person_ids) == 0:
-        return None
-    elif len(person_ids) > 1:
-        print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
-        try:
-            person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
-        except ValueError:
-            pass
-        return None
-    else:
-        return person_ids[0]
+    return movie_graph.person_id_for_name(name, interactive, policy, birth,
+                                          max_distance)
+
+
+def person_info(person_id):
+    """
+    Returns the name and birth year of a person.
+    """
+    return movie_graph.person_info(person_id)
+
+
+def movie_info(movie_id):
+    """
+    Returns the title and year of a movie.
+    """
+    return movie_graph.movie_info(movie_id)
 
 
 def neighbors_for_person(person_id):
@@ -192,12 +212,7 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    return movie_graph.neighbors_for_person(person_id)
 
 
 if __name__ == "__main__":
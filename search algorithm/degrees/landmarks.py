@@ -0,0 +1,80 @@
+"""
+Landmark distance index for approximate degrees of separation.
+
+A few hundred well-connected people are picked as landmarks and a BFS
+from each stores its distance to every person in one flat bytearray
+(255 = not reached, 254 = at least 254 degrees away). By the triangle inequality, for any landmark L:
+
+    |d(L, a) - d(L, b)|  <=  d(a, b)  <=  d(L, a) + d(L, b)
+
+so the tightest of these over all landmarks brackets the true distance
+with a handful of byte lookups.
+"""
+
+UNREACHED = 255
+# stored for every distance too large for a byte; only a lower bound
+FAR = 254
+
+
+class LandmarkIndex():
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        # person indexes of the landmarks
+        self.landmarks = landmarks
+        # distances[i * size + p] = degrees from landmarks[i] to person p
+        self.distances = distances
+        self.size = len(graph.person_ids)
+
+    @classmethod
+    def build(cls, graph, count=200):
+        """
+        Picks the `count` people with the most movies as landmarks, one
+        BFS per landmark, and returns the index.
+        """
+        size = len(graph.person_ids)
+        offsets = graph.person_offsets
+        by_degree = sorted(
+            range(size),
+            key=lambda person: offsets[person] - offsets[person + 1])
+        landmarks = by_degree[:count]
+
+        distances = bytearray(b"\xff") * (size * len(landmarks))
+        for i, landmark in enumerate(landmarks):
+            tree = graph.distances_from(landmark)
+            base = i * size
+            for person, distance in enumerate(tree.distance):
+                if distance != -1:
+                    distances[base + person] = min(distance, FAR)
+        return cls(graph, landmarks, distances)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees between two person
+        indexes. upper is None when no landmark is within FAR of both;
+        (None, None) means they are known to be unconnected.
+        """
+        if source == target:
+            return 0, 0
+        if not self.graph.connected(source, target):
+            return None, None
+
+        distances = self.distances
+        size = self.size
+        lower = 1
+        upper = None
+        for i in range(len(self.landmarks)):
+            a = distances[i * size + source]
+            b = distances[i * size + target]
+            if a == UNREACHED or b == UNREACHED:
+                continue
+            # FAR understates a distance: |a - b| is still a lower bound
+            # when only one side is FAR, and a + b is never an upper bound
+            if a == FAR or b == FAR:
+                if a == b:
+                    continue
+            elif upper is None or a + b < upper:
+                upper = a + b
+            gap = a - b if a > b else b - a
+            if gap > lower:
+                lower = gap
+        return lower, upper
@@ -0,0 +1,24 @@
+"""
+Latency percentiles shared by the benchmark (bench.py) and the load-test
+client (client.py).
+"""
+
+
+def percentile(samples, fraction):
+    """
+    Returns the nearest-rank percentile of sorted samples.
+    """
+    if not samples:
+        return None
+    rank = max(0, min(len(samples) - 1,
+                      int(round(fraction * len(samples) + 0.5)) - 1))
+    return samples[rank]
+
+
+def latency_ms(samples, fraction):
+    """
+    Returns a percentile of sorted latencies in seconds as milliseconds,
+    or None when there are no samples.
+    """
+    value = percentile(samples, fraction)
+    return None if value is None else value * 1000
@@ -0,0 +1,922 @@
+"""
+Reusable, thread-safe movie graph for degrees.
+
+A GraphData holds one loaded dataset and is never mutated once built
+(apart from lazily built, lock-protected helpers such as the name
+index), so any number of threads can search it at once. MovieGraph
+wraps the current GraphData: every query reads `self.data` exactly once
+and runs against that version, and reload() builds a new GraphData off
+to the side before swapping the reference in a single assignment. That
+way in-flight queries finish on the dataset they started with and never
+block on a reload.
+"""
+
+import csv
+import os
+import threading
+from array import array
+
+import snapshot
+from cache import NOT_CONNECTED, PathCache
+from csr import CSRGraph, join_paths
+from landmarks import LandmarkIndex
+from nameindex import NameIndex
+from stream import MetadataOverlay, load_streaming
+from tables import MetadataTables
+from util import Node, QueueFrontier
+
+# number of year/exclude movie masks kept per dataset
+MASK_CACHE_SIZE = 32
+
+
+class GraphData():
+    def __init__(self, names, people, movies, graph, metadata=None,
+                 engine="dict", cache_capacity=1024):
+        # Maps names to a set of corresponding person_ids
+        self.names = names
+        # Maps person_ids to a dictionary of: name, birth, movies
+        self.people = people
+        # Maps movie_ids to a dictionary of: title, year, stars
+        self.movies = movies
+        # Integer-indexed CSR copy of the graph with component labels
+        self.graph = graph
+        if graph.components is None:
+            graph.label_components()
+        # "dict" searches the dicts above, "csr"/"stream" search `graph`
+        self.engine = engine
+        # Lazy name/birth/title lookup replacing the dicts: MetadataTables
+        # with engine="csr", an on-disk MetadataStore with engine="stream"
+        self.metadata = metadata
+        # LRU cache of shortest_path results for this dataset
+        self.path_cache = PathCache(capacity=cache_capacity)
+        self.name_index = None
+        # release year per movie index, and cached movie filter masks
+        self.years = None
+        self.masks = {}
+        # optional LandmarkIndex, see build_landmarks
+        self.landmarks = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, directory, engine="dict", use_snapshot=True,
+             cache_capacity=1024, metadata_path=None):
+        """
+        Load data from CSV files into a new GraphData.
+
+        A compact CSRGraph with connected-component labels is always built,
+        so unconnected pairs are rejected without searching. With
+        engine="csr" it is also used by shortest_path for bidirectional
+        searches.
+
+        With engine="csr" the graph is built by CSRGraph.from_csv and the
+        `names` / `people` / `movies` dicts stay empty; names, birth years
+        and titles are packed into MetadataTables and read lazily by
+        person_info / movie_info. With engine="stream" they go to an
+        on-disk metadata store instead, kept at `metadata_path` (default:
+        see stream.metadata_paths).
+
+        With use_snapshot=True the graph and metadata tables are cached in
+        a binary snapshot next to the CSVs and memory-mapped on later runs;
+        the snapshot is rebuilt whenever a CSV's mtime or size changes. The
+        dict engine then builds its dicts from the tables instead of
+        parsing the CSVs. The stream engine likewise reuses its metadata
+        store while the CSVs are unchanged.
+        """
+        if engine == "stream":
+            graph, metadata = load_streaming(directory, metadata_path,
+                                             reuse=use_snapshot)
+            return cls({}, {}, {}, graph, metadata, engine, cache_capacity)
+
+        if engine == "dict" and not use_snapshot:
+            names, people, movies = parse_csv(directory)
+            graph = CSRGraph.from_indexes(people, movies)
+            return cls(names, people, movies, graph, None, engine,
+                       cache_capacity)
+
+        cached = None
+        if use_snapshot:
+            path = snapshot.snapshot_path(directory)
+            source_fingerprint = snapshot.fingerprint(directory)
+            cached = snapshot.read_snapshot(path, source_fingerprint)
+        if cached is not None:
+            graph, metadata = cached
+        else:
+            graph = CSRGraph.from_csv(directory)
+            metadata = MetadataTables.from_csv(directory, graph)
+            if use_snapshot:
+                try:
+                    snapshot.write_snapshot(path, source_fingerprint,
+                                            graph, metadata)
+                except OSError:
+                    # read-only data directory: carry on without a cache
+                    pass
+
+        if engine == "dict":
+            names, people, movies = metadata.to_indexes(graph)
+            return cls(names, people, movies, graph, None, engine,
+                       cache_capacity)
+        return cls({}, {}, {}, graph, metadata, engine, cache_capacity)
+
+    def apply_updates(self, people=(), movies=(), stars=()):
+        """
+        Returns a new GraphData with extra rows applied, leaving this one
+        untouched so queries running against it are unaffected.
+
+        people  (id, name, birth) rows
+        movies  (id, title, year) rows
+        stars   (person_id, movie_id) rows
+
+        Rows for ids that already exist, stars naming unknown ids and
+        duplicate credits are ignored, as in load. Derived state is only
+        invalidated where the update can have changed it: cached paths
+        survive unless an endpoint's component gained credits, the name
+        index is merged rather than rebuilt, and movie masks, release
+        years and landmarks are kept when no movies or credits were added.
+        """
+        graph = self.graph
+        new_people = [row for row in people
+                      if row[0] not in graph.person_index]
+        new_people = list({row[0]: row for row in new_people}.values())
+        new_movies = [row for row in movies
+                      if row[0] not in graph.movie_index]
+        new_movies = list({row[0]: row for row in new_movies}.values())
+        person_ids = [row[0] for row in new_people]
+        movie_ids = [row[0] for row in new_movies]
+        added_people = {pid: len(graph.person_ids) + i
+                        for i, pid in enumerate(person_ids)}
+        added_movies = {mid: len(graph.movie_ids) + i
+                        for i, mid in enumerate(movie_ids)}
+
+        edges = []
+        seen = set()
+        for person_id, movie_id in stars:
+            person = graph.person_index.get(person_id,
+                                            added_people.get(person_id))
+            movie = graph.movie_index.get(movie_id, added_movies.get(movie_id))
+            if person is None or movie is None or (person, movie) in seen:
+                continue
+            if (person < len(graph.person_ids) and movie < len(graph.movie_ids)
+                    and movie in graph.movies_for(person)):
+                continue
+            seen.add((person, movie))
+            edges.append((person, movie))
+
+        # copy-on-write dicts: only touched entries are copied
+        names, people_map, movies_map = self.names, self.people, self.movies
+        metadata = self.metadata
+        if metadata is not None:
+            # new rows go into an overlay; the shared store is not written
+            if new_people or new_movies:
+                metadata = MetadataOverlay.over(metadata, new_people,
+                                                new_movies)
+        else:
+            if new_people:
+                names = dict(names)
+                people_map = dict(people_map)
+                for person_id, name, birth in new_people:
+                    key = name.lower()
+                    names[key] = names.get(key, set()) | {person_id}
+                    people_map[person_id] = {"name": name, "birth": birth,
+                                             "movies": set()}
+            if new_movies or edges:
+                movies_map = dict(movies_map)
+                for movie_id, title, year in new_movies:
+                    movies_map[movie_id] = {"title": title, "year": year,
+                                            "stars": set()}
+            if edges:
+                people_map = dict(people_map)
+                for person, movie in edges:
+                    person_id = _id_at(graph, person_ids, person, "person")
+                    movie_id = _id_at(graph, movie_ids, movie, "movie")
+                    person = people_map[person_id]
+                    people_map[person_id] = dict(
+                        person, movies=person["movies"] | {movie_id})
+                    movie = movies_map[movie_id]
+                    movies_map[movie_id] = dict(
+                        movie, stars=movie["stars"] | {person_id})
+
+        if new_people or new_movies or edges:
+            new_graph = graph.extend(person_ids, movie_ids, edges)
+        else:
+            new_graph = graph
+        data = GraphData(names, people_map, movies_map, new_graph,
+                         metadata, self.engine, self.path_cache.capacity)
+
+        # components that gained credits; paths elsewhere are unchanged
+        touched = set()
+        old_size = len(graph.person_ids)
+        for person, movie in edges:
+            if person < old_size:
+                touched.add(graph.components[person])
+            if movie < len(graph.movie_ids):
+                cast = graph.stars_for(movie)
+                if len(cast):
+                    touched.add(graph.components[cast[0]])
+
+        def untouched(source, target):
+            index = graph.person_index
+            return (graph.components[index[source]] not in touched
+                    and graph.components[index[target]] not in touched)
+
+        data.path_cache = self.path_cache.carry_over(untouched)
+
+        if self.name_index is not None:
+            if new_people:
+                lookup = (metadata.person_ids_for_name
+                          if metadata is not None
+                          else lambda key: names.get(key, set()))
+                data.name_index = self.name_index.extended(
+                    (row[1].lower() for row in new_people), lookup)
+            else:
+                data.name_index = self.name_index
+
+        if not new_movies:
+            data.masks = dict(self.masks)
+            data.years = self.years
+        elif self.years is not None:
+            years = array("h", self.years)
+            for movie_id, title, year in new_movies:
+                years.append(int(year) if year and year.isdigit() else 0)
+            data.years = years
+
+        if not edges and not new_people:
+            data.landmarks = self.landmarks
+        return data
+
+    def shortest_path(self, source, target, bidirectional=True, use_cache=True,
+                      years=None, exclude=(), predicate=None, budget=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        `years`, `exclude` and `predicate` restrict which movies may link
+        two people; see movie_filter. Filtered searches run bidirectionally
+        over the CSR graph and are not cached.
+
+        With a `budget` the search runs bidirectionally over the CSR graph
+        and raises csr.BudgetExceeded after expanding that many people.
+
+        By default the search grows frontiers from both ends and stops when
+        they meet; pass bidirectional=False to run the one-sided BFS instead.
+
+        Results are kept in the bounded LRU `path_cache`, which answers
+        (a, b) and (b, a) from the same entry; pass use_cache=False to
+        bypass it.
+
+        People in different connected components are rejected from the
+        precomputed labels without any search.
+
+        If no possible path, raises Exception("no solution").
+        """
+        if not self.connected(source, target):
+            raise Exception("no solution")
+
+        allowed = self.movie_filter(years, exclude, predicate)
+        use_cache = use_cache and allowed is None
+
+        if use_cache:
+            cached = self.path_cache.get(source, target)
+            if cached is NOT_CONNECTED:
+                raise Exception("no solution")
+            if cached is not None:
+                return cached
+
+        if allowed is not None or budget is not None:
+            graph = self.graph
+            path = graph.shortest_path(graph.person_index[source],
+                                       graph.person_index[target],
+                                       allowed, budget)
+            if path is not None:
+                path = graph.to_ids(path)
+        else:
+            path = self._search(source, target, bidirectional)
+
+        if use_cache:
+            self.path_cache.put(source, target,
+                                NOT_CONNECTED if path is None else path)
+        if path is None:
+            raise Exception("no solution")
+        return path
+
+    def _search(self, source, target, bidirectional):
+        """
+        Runs the requested search, returning the path or None if unconnected.
+        """
+        graph = self.graph
+        if bidirectional and self.engine != "dict":
+            path = graph.shortest_path(graph.person_index[source],
+                                       graph.person_index[target])
+            return None if path is None else graph.to_ids(path)
+        if bidirectional:
+            return self.bidirectional_path(source, target)
+        try:
+            return self.breadth_first_path(source, target)
+        except Exception as e:
+            if e.args != ("no solution",):
+                raise
+            return None
+
+    def breadth_first_path(self, source, target):
+        """
+        One-sided BFS from source to target, returning the same
+        (movie_id, person_id) list as shortest_path.
+        """
+
+        """
+        initial state
+        queue Frontier: Source
+        Explored Set:
+
+        queue Frontier: All neighbors of source
+        Explored Set: Source
+
+        While True:
+
+            if frontier is empty:
+                no path exists
+
+            remove node
+
+            else if removed node.state == target :
+                if node is equal to target we have our solution
+
+            else if removed node.state not in explored:
+                remove node from queue Frontier and into explored
+                Add neighbors of the removed frontier into queue Frontier
+
+
+        Keep checking for target
+
+        """
+
+        explored = set()
+        frontier = QueueFrontier()
+        source = Node(state=source, parent=None, action=None)
+        frontier.add(source)
+
+        while True:
+
+            # if frontier is empty, then we have no path
+            if frontier.empty():
+                raise Exception("no solution")
+
+            node = frontier.remove()
+
+            # mark node as explored
+            explored.add(node.state)
+
+            # if node is equal to target we have our solution
+            if node.state == target:
+                # return solution
+                actions = []
+                cells = []
+                solution = []
+                while node.parent is not None:
+                    actions.append(node.action)
+                    cells.append(node.state)
+                    node = node.parent
+                actions.reverse()
+                cells.reverse()
+                for x, y in zip(actions, cells):
+                    solution.append((x, y))
+                return solution
+
+            #add the nodes of the removed node to the frontier
+            neighbors = self.neighbors_for_person(node.state)
+            for action, state in neighbors:
+                if not frontier.contains_state(state) and state not in explored:
+                    child = Node(state=state, parent=node, action=action)
+                    frontier.add(child)
+
+    def bidirectional_path(self, source, target):
+        """
+        Bidirectional BFS from source and target, returning the same
+        (movie_id, person_id) list as shortest_path, or None if unconnected.
+
+        Each side keeps a map of discovered person_id -> (movie_id, person_id)
+        link towards its own root. The side with the smaller frontier expands
+        one full layer at a time, and the search stops at the first layer
+        that touches the other side.
+        """
+        if source == target:
+            return []
+
+        # person_id -> (movie_id, neighbour one step closer to the root)
+        forward = {source: None}
+        backward = {target: None}
+        forward_layer = [source]
+        backward_layer = [target]
+
+        while forward_layer and backward_layer:
+
+            # always grow the cheaper side
+            expand_forward = len(forward_layer) <= len(backward_layer)
+            if expand_forward:
+                layer, visited, other = forward_layer, forward, backward
+            else:
+                layer, visited, other = backward_layer, backward, forward
+
+            next_layer = []
+            meeting = None
+            for state in layer:
+                for action, neighbor in self.neighbors_for_person(state):
+                    if neighbor in visited:
+                        continue
+                    visited[neighbor] = (action, state)
+                    next_layer.append(neighbor)
+                    if neighbor in other:
+                        meeting = neighbor
+                        break
+                if meeting is not None:
+                    break
+
+            if meeting is not None:
+                return join_paths(forward, backward, meeting)
+
+            if expand_forward:
+                forward_layer = next_layer
+            else:
+                backward_layer = next_layer
+
+        return None
+
+    def connected(self, source, target):
+        """
+        Returns whether two people are connected at all, in O(1)
+        from the precomputed component labels.
+        """
+        index = self.graph.person_index
+        return self.graph.connected(index[source], index[target])
+
+    def component_of(self, person_id):
+        """
+        Returns the connected component label of a person.
+        """
+        return self.graph.components[self.graph.person_index[person_id]]
+
+    def component_sizes(self):
+        """
+        Returns a list of component sizes indexed by component label.
+        """
+        return self.graph.component_sizes()
+
+    def export_components(self, path):
+        """
+        Writes person_id,component rows to a CSV file at `path`.
+        """
+        graph = self.graph
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("person_id", "component"))
+            for index, label in enumerate(graph.components):
+                writer.writerow((graph.person_ids[index], label))
+
+    def distances_from(self, person_id, max_depth=None,
+                       years=None, exclude=(), predicate=None):
+        """
+        Runs one BFS from person_id, optionally limited to max_depth degrees,
+        and returns a SearchTree holding compact distance/parent arrays.
+        Use tree.distance_to(id), tree.path_to(id) and tree.within(n) to
+        read it without searching again. Filters work as in shortest_path.
+        """
+        graph = self.graph
+        allowed = self.movie_filter(years, exclude, predicate)
+        return graph.distances_from(graph.person_index[person_id], max_depth,
+                                    allowed)
+
+    def movie_filter(self, years=None, exclude=(), predicate=None):
+        """
+        Returns a movie mask (bytearray over movie indexes, 1 = usable) or
+        None when no filter is given.
+
+        years      (first, last) release years, either end may be None
+        exclude    movie ids that may not be used
+        predicate  predicate(movie_id) -> bool, called once per movie
+
+        Masks for year/exclude filters are cached per dataset, so repeated
+        filtered searches cost no more than unfiltered ones.
+        """
+        if years is None and not exclude and predicate is None:
+            return None
+
+        key = None
+        if predicate is None:
+            key = (tuple(years) if years is not None else None,
+                   frozenset(exclude))
+            with self.lock:
+                mask = self.masks.get(key)
+            if mask is not None:
+                return mask
+
+        graph = self.graph
+        if years is not None:
+            first, last = years
+            release = self.movie_years()
+            mask = bytearray(
+                1 if year and (first is None or year >= first)
+                and (last is None or year <= last) else 0
+                for year in release)
+        else:
+            mask = bytearray(b"\x01") * len(graph.movie_ids)
+        for movie_id in exclude:
+            index = graph.movie_index.get(movie_id)
+            if index is not None:
+                mask[index] = 0
+        if predicate is not None:
+            movie_ids = graph.movie_ids
+            for index in range(len(mask)):
+                if mask[index] and not predicate(movie_ids[index]):
+                    mask[index] = 0
+
+        if key is not None:
+            with self.lock:
+                if len(self.masks) >= MASK_CACHE_SIZE:
+                    self.masks.clear()
+                self.masks[key] = mask
+        return mask
+
+    def movie_years(self):
+        """
+        Returns release years as an array over movie indexes (0 = unknown),
+        reading them on first use.
+        """
+        if self.years is None:
+            with self.lock:
+                if self.years is None:
+                    graph = self.graph
+                    years = array("h", bytes(2 * len(graph.movie_ids)))
+                    if self.metadata is not None:
+                        rows = self.metadata.movie_years()
+                    else:
+                        rows = ((movie_id, movie["year"])
+                                for movie_id, movie in self.movies.items())
+                    for movie_id, year in rows:
+                        index = graph.movie_index.get(movie_id)
+                        if index is not None and year and year.isdigit():
+                            years[index] = int(year)
+                    self.years = years
+        return self.years
+
+    def build_landmarks(self, count=200):
+        """
+        Builds the landmark distance index used by estimate_degrees,
+        running one BFS per landmark.
+        """
+        landmarks = LandmarkIndex.build(self.graph, count)
+        self.landmarks = landmarks
+        return landmarks
+
+    def estimate_degrees(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation between
+        two people from the landmark index, without searching. upper is
+        None if no landmark reaches both; (None, None) means unconnected.
+        """
+        landmarks = self.landmarks
+        if landmarks is None:
+            raise Exception("landmark index not built")
+        index = self.graph.person_index
+        return landmarks.bounds(index[source], index[target])
+
+    def nearest_targets(self, source, targets, count=1):
+        """
+        Returns up to `count` (person_id, path) pairs for the targets
+        closest to source, found with a single shared BFS.
+        """
+        graph = self.graph
+        index = graph.person_index
+        found = graph.nearest(index[source],
+                              {index[target] for target in targets}, count)
+        return [(graph.person_ids[target], graph.to_ids(path))
+                for target, path in found]
+
+    def k_shortest_paths(self, source, target, k):
+        """
+        Returns up to k distinct shortest (movie_id, person_id) paths
+        between two people, shortest first; see CSRGraph.k_shortest_paths.
+        """
+        graph = self.graph
+        paths = graph.k_shortest_paths(graph.person_index[source],
+                                       graph.person_index[target], k)
+        return [graph.to_ids(path) for path in paths]
+
+    def person_id_for_name(self, name, interactive=True, policy=None,
+                           birth=None, max_distance=0):
+        """
+        Returns the IMDB id for a person's name,
+        resolving ambiguities as needed.
+
+        Ambiguous names are settled by `policy` when one is given:
+        "most_movies" picks the person with the most credits, "birth" picks
+        the birth year closest to the `birth` hint. Without a policy they
+        are prompted for, or return None with interactive=False.
+
+        If nothing matches exactly and max_distance > 0, the closest names
+        within that many edits are used instead.
+        """
+        name_index = self.get_name_index()
+        person_ids = list(name_index.exact(name))
+        if len(person_ids) == 0 and max_distance > 0:
+            matches = name_index.fuzzy(name, max_distance)
+            if matches:
+                closest = matches[0][0]
+                for distance, key in matches:
+                    if distance == closest:
+                        person_ids.extend(name_index.exact(key))
+        if len(person_ids) == 0:
+            return None
+        elif len(person_ids) > 1:
+            if policy is not None:
+                return self.disambiguate(person_ids, policy, birth)
+            if not interactive:
+                return None
+            print(f"Which '{name}'?")
+            for person_id in person_ids:
+                person = self.person_info(person_id)
+                name = person["name"]
+                birth = person["birth"]
+                print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+            try:
+                person_id = input("Intended Person ID: ")
+                if person_id in person_ids:
+                    return person_id
+            except ValueError:
+                pass
+            return None
+        else:
+            return person_ids[0]
+
+    def disambiguate(self, person_ids, policy="most_movies", birth=None):
+        """
+        Picks one of several person ids without prompting.
+        """
+        def movie_count(person_id):
+            graph = self.graph
+            index = graph.person_index[person_id]
+            return graph.person_offsets[index + 1] - graph.person_offsets[index]
+
+        def birth_gap(person_id):
+            year = self.person_info(person_id)["birth"]
+            if birth is None or not year:
+                return float("inf")
+            return abs(int(year) - int(birth))
+
+        if policy == "most_movies":
+            key = lambda person_id: (-movie_count(person_id), person_id)
+        elif policy == "birth":
+            key = lambda person_id: (birth_gap(person_id),
+                                     -movie_count(person_id), person_id)
+        else:
+            raise ValueError(f"unknown disambiguation policy: {policy}")
+        return min(person_ids, key=key)
+
+    def get_name_index(self):
+        """
+        Returns the NameIndex over the loaded names, building it on first use.
+        """
+        if self.name_index is None:
+            with self.lock:
+                if self.name_index is None:
+                    if self.metadata is not None:
+                        self.name_index = self.metadata.name_index()
+                    else:
+                        self.name_index = NameIndex.from_names(self.names)
+        return self.name_index
+
+    def person_info(self, person_id):
+        """
+        Returns the name and birth year of a person.
+        """
+        if self.metadata is not None:
+            return self.metadata.person(person_id)
+        return self.people[person_id]
+
+    def movie_info(self, movie_id):
+        """
+        Returns the title and year of a movie.
+        """
+        if self.metadata is not None:
+            return self.metadata.movie(movie_id)
+        return self.movies[movie_id]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        if self.metadata is not None:
+            graph = self.graph
+            return {
+                (graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in graph.neighbors(graph.person_index[person_id])
+            }
+        movies = self.movies
+        neighbors = set()
+        for movie_id in self.people[person_id]["movies"]:
+            for person_id in movies[movie_id]["stars"]:
+                neighbors.add((movie_id, person_id))
+        return neighbors
+
+
+class MovieGraph():
+    """
+    Handle on the current GraphData. Queries are safe to run from many
+    threads; load/reload swap in a new dataset atomically.
+    """
+
+    def __init__(self, data=None):
+        self.data = data
+        self.source = None
+        # serialises reloads against each other, never against queries
+        self.reload_lock = threading.Lock()
+
+    @classmethod
+    def from_directory(cls, directory, engine="dict", use_snapshot=True,
+                       cache_capacity=1024, metadata_path=None):
+        graph = cls()
+        graph.load(directory, engine, use_snapshot, cache_capacity,
+                   metadata_path)
+        return graph
+
+    def load(self, directory, engine="dict", use_snapshot=True,
+             cache_capacity=1024, metadata_path=None):
+        """
+        Loads a dataset and swaps it in. Queries already running keep
+        using the previous dataset until they return.
+        """
+        with self.reload_lock:
+            data = GraphData.load(directory, engine, use_snapshot,
+                                  cache_capacity, metadata_path)
+            self.source = (directory, engine, use_snapshot, cache_capacity,
+                           metadata_path)
+            self.data = data
+        return data
+
+    def apply_updates(self, people=(), movies=(), stars=()):
+        """
+        Applies extra people/movies/star rows without reloading; see
+        GraphData.apply_updates. Queries already running keep using the
+        previous dataset. A later reload() goes back to the CSV files.
+        """
+        with self.reload_lock:
+            data = self._current().apply_updates(people, movies, stars)
+            self.data = data
+        return data
+
+    def apply_delta(self, directory):
+        """
+        Applies the people.csv / movies.csv / stars.csv found in a delta
+        directory; see read_delta.
+        """
+        return self.apply_updates(*read_delta(directory))
+
+    def reload(self):
+        """
+        Reloads from the directory and options of the last load(), keeping
+        the path cache's current capacity.
+        """
+        if self.source is None:
+            raise Exception("nothing loaded")
+        directory, engine, use_snapshot, _, metadata_path = self.source
+        return self.load(directory, engine, use_snapshot,
+                         self._current().path_cache.capacity, metadata_path)
+
+    def resize_cache(self, capacity):
+        """
+        Changes the path cache capacity, evicting least recently used
+        entries. The new capacity carries over to updates and reloads.
+        """
+        self._current().path_cache.resize(capacity)
+
+    def cache_stats(self):
+        """
+        Returns the path cache's hit, miss and eviction counters.
+        """
+        return self._current().path_cache.stats()
+
+    def _current(self):
+        data = self.data
+        if data is None:
+            raise Exception("no data loaded")
+        return data
+
+    def shortest_path(self, source, target, bidirectional=True, use_cache=True,
+                      years=None, exclude=(), predicate=None, budget=None):
+        return self._current().shortest_path(
+            source, target, bidirectional, use_cache,
+            years=years, exclude=exclude, predicate=predicate, budget=budget)
+
+    def neighbors_for_person(self, person_id):
+        return self._current().neighbors_for_person(person_id)
+
+    def connected(self, source, target):
+        return self._current().connected(source, target)
+
+    def component_sizes(self):
+        return self._current().component_sizes()
+
+    def export_components(self, path):
+        return self._current().export_components(path)
+
+    def distances_from(self, person_id, max_depth=None,
+                       years=None, exclude=(), predicate=None):
+        return self._current().distances_from(
+            person_id, max_depth,
+            years=years, exclude=exclude, predicate=predicate)
+
+    def build_landmarks(self, count=200):
+        return self._current().build_landmarks(count)
+
+    def estimate_degrees(self, source, target):
+        return self._current().estimate_degrees(source, target)
+
+    def nearest_targets(self, source, targets, count=1):
+        return self._current().nearest_targets(source, targets, count)
+
+    def k_shortest_paths(self, source, target, k):
+        return self._current().k_shortest_paths(source, target, k)
+
+    def person_id_for_name(self, name, interactive=True, policy=None,
+                           birth=None, max_distance=0):
+        return self._current().person_id_for_name(
+            name, interactive, policy, birth, max_distance)
+
+    def person_info(self, person_id):
+        return self._current().person_info(person_id)
+
+    def movie_info(self, movie_id):
+        return self._current().movie_info(movie_id)
+
+
+def read_delta(directory):
+    """
+    Reads whichever of people.csv, movies.csv and stars.csv exist in a
+    delta directory, returning (people, movies, stars) row lists in the
+    form GraphData.apply_updates takes.
+    """
+    def rows(name, fields):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [tuple(row[field] for field in fields)
+                    for row in csv.DictReader(f)]
+
+    return (rows("people.csv", ("id", "name", "birth")),
+            rows("movies.csv", ("id", "title", "year")),
+            rows("stars.csv", ("person_id", "movie_id")))
+
+
+def _id_at(graph, added_ids, index, kind):
+    """
+    Returns the id at a person/movie index of the extended graph.
+    """
+    ids = graph.person_ids if kind == "person" else graph.movie_ids
+    if index < len(ids):
+        return ids[index]
+    return added_ids[index - len(ids)]
+
+
+def parse_csv(directory):
+    """
+    Parses the three CSV files into new names, people and movies dicts.
+    """
+    names = {}
+    people = {}
+    movies = {}
+
+    # Load people
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            people[row["id"]] = {
+                "name": row["name"],
+                "birth": row["birth"],
+                "movies": set()
+            }
+            if row["name"].lower() not in names:
+                names[row["name"].lower()] = {row["id"]}
+            else:
+                names[row["name"].lower()].add(row["id"])
+
+    # Load movies
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            movies[row["id"]] = {
+                "title": row["title"],
+                "year": row["year"],
+                "stars": set()
+            }
+
+    # Load stars
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                people[row["person_id"]]["movies"].add(row["movie_id"])
+                movies[row["movie_id"]]["stars"].add(row["person_id"])
+            except KeyError:
+                pass
+
+    return names, people, movies
@@ -0,0 +1,126 @@
+"""
+Sorted name index supporting exact, prefix and fuzzy lookup.
+
+Names are kept lowercased in one sorted list. Prefix queries are two
+bisects. Fuzzy queries walk the sorted list as an implicit trie: every
+run of names sharing a prefix is one trie node, its children are found
+by bisecting on the next character, and a Levenshtein DP row is carried
+down each branch so whole runs are skipped as soon as they cannot come
+within the edit-distance bound.
+"""
+
+import heapq
+from bisect import bisect_left
+
+
+class NameIndex():
+    def __init__(self, keys, lookup):
+        """
+        `keys` are the lowercased names; `lookup(key)` returns the set of
+        person ids with that name.
+        """
+        self.keys = sorted(set(keys))
+        self.lookup = lookup
+
+    @classmethod
+    def from_names(cls, names):
+        """
+        Builds the index from a lowercased name -> set of ids dict.
+        """
+        return cls(names.keys(), lambda key: names.get(key, set()))
+
+    @classmethod
+    def from_sorted(cls, keys, lookup):
+        """
+        Wraps lowercased names that are already sorted and distinct, such
+        as a tables.StringTable, without copying them.
+        """
+        index = cls.__new__(cls)
+        index.keys = keys
+        index.lookup = lookup
+        return index
+
+    def extended(self, keys, lookup):
+        """
+        Returns a new index with `keys` added and `lookup` as its id lookup.
+        The existing key list is already sorted, so this is a merge rather
+        than a full re-sort.
+        """
+        existing = self.keys
+        added = sorted({
+            key for key in keys
+            if not _contains(existing, key)
+        })
+        return NameIndex.from_sorted(list(heapq.merge(existing, added)),
+                                     lookup)
+
+    def exact(self, name):
+        """
+        Returns the set of person ids for a name, ignoring case.
+        """
+        return set(self.lookup(name.lower()))
+
+    def prefix(self, prefix, limit=None):
+        """
+        Returns the names starting with `prefix`, in sorted order.
+        """
+        prefix = prefix.lower()
+        keys = self.keys
+        lo = bisect_left(keys, prefix)
+        hi = lo
+        while hi < len(keys) and keys[hi].startswith(prefix):
+            hi += 1
+            if limit is not None and hi - lo >= limit:
+                break
+        return keys[lo:hi]
+
+    def fuzzy(self, name, max_distance=1, limit=None):
+        """
+        Returns (distance, name) pairs for every name within
+        `max_distance` edits of `name`, closest first.
+        """
+        query = name.lower()
+        matches = []
+        first_row = list(range(len(query) + 1))
+        self._walk(query, max_distance, "", 0, len(self.keys),
+                   first_row, matches)
+        matches.sort()
+        return matches if limit is None else matches[:limit]
+
+    def _walk(self, query, max_distance, prefix, lo, hi, row, matches):
+        keys = self.keys
+        depth = len(prefix)
+
+        # the name equal to the prefix itself sorts first in its run
+        if lo < hi and len(keys[lo]) == depth:
+            if row[-1] <= max_distance:
+                matches.append((row[-1], keys[lo]))
+            lo += 1
+
+        while lo < hi:
+            char = keys[lo][depth]
+            end = bisect_left(keys, prefix + chr(ord(char) + 1), lo, hi)
+            child = _next_row(query, row, char)
+            if min(child) <= max_distance:
+                self._walk(query, max_distance, prefix + char, lo, end,
+                           child, matches)
+            lo = end
+
+
+def _contains(keys, key):
+    index = bisect_left(keys, key)
+    return index < len(keys) and keys[index] == key
+
+
+def _next_row(query, row, char):
+    """
+    Extends a Levenshtein DP row by one character of the candidate.
+    """
+    next_row = [row[0] + 1]
+    for i, query_char in enumerate(query, 1):
+        next_row.append(min(
+            next_row[i - 1] + 1,
+            row[i] + 1,
+            row[i - 1] + (query_char != char),
+        ))
+    return next_row
@@ -0,0 +1,321 @@
+"""
+Local asyncio query server for degrees.
+
+Loads the dataset once and answers HTTP GET requests with JSON:
+
+    GET /path?source=Kevin+Bacon&target=Tom+Cruise
+        {"source": {...}, "target": {...}, "degrees": 2,
+         "path": [{"movie": {...}, "person": {...}}, ...]}
+    GET /path?source=102&target=129&by=id
+    GET /health
+    GET /stats
+
+Searches are CPU-bound, so they run in a worker pool (forked processes
+that inherit the loaded graph, or threads with --threads) while the
+event loop only parses requests and writes responses. Every search has
+a node-expansion budget (422 when exceeded) and a wall-clock timeout
+(504 when exceeded). A timed-out request is answered immediately, but a
+search already running in a worker process is not interrupted; the
+budget is what bounds how long it can keep that worker busy.
+
+Ambiguous names are settled with the most_movies policy.
+
+Usage: python server.py [directory] [--host H] [--port N] [--workers N]
+                        [--threads] [--timeout S] [--budget N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import degrees
+from csr import BudgetExceeded
+from workerpool import process_pool
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    504: "Gateway Timeout",
+}
+MAX_HEADER_BYTES = 16384
+
+
+def find_path(source, target, by_id=False, budget=None):
+    """
+    Resolves both people and searches for the shortest path between them.
+    Runs inside a worker and returns (status, JSON-ready dict).
+    """
+    resolved = []
+    for value in (source, target):
+        if by_id:
+            person_id = value if _person(value) is not None else None
+        else:
+            person_id = degrees.person_id_for_name(
+                value, interactive=False, policy="most_movies")
+        if person_id is None:
+            return 404, {"error": f"person not found: {value}"}
+        resolved.append(person_id)
+    source, target = resolved
+
+    result = {"source": _describe_person(source),
+              "target": _describe_person(target)}
+    try:
+        path = degrees.shortest_path(source, target, budget=budget)
+    except BudgetExceeded as e:
+        result["error"] = f"search budget exceeded: {e}"
+        return 422, result
+    except Exception as e:
+        if e.args != ("no solution",):
+            raise
+        result["error"] = "not connected"
+        return 200, result
+
+    result["degrees"] = len(path)
+    result["path"] = [
+        {"movie": _describe_movie(movie_id),
+         "person": _describe_person(person_id)}
+        for movie_id, person_id in path
+    ]
+    return 200, result
+
+
+def _person(person_id):
+    try:
+        return degrees.person_info(person_id)
+    except KeyError:
+        return None
+
+
+def _describe_person(person_id):
+    info = _person(person_id) or {}
+    return {"id": person_id, "name": info.get("name"),
+            "birth": info.get("birth")}
+
+
+def _describe_movie(movie_id):
+    info = degrees.movie_info(movie_id) or {}
+    return {"id": movie_id, "title": info.get("title"),
+            "year": info.get("year")}
+
+
+class QueryServer():
+    def __init__(self, directory, workers=None, use_threads=False,
+                 timeout=5.0, budget=1000000, max_pending=None):
+        self.directory = directory
+        self.workers = workers or os.cpu_count() or 1
+        self.use_threads = use_threads
+        self.timeout = timeout
+        self.budget = budget
+        # requests waiting for a worker beyond this many are queued here
+        # rather than piling up inside the executor
+        self.pending = asyncio.Semaphore(max_pending or self.workers * 4)
+        self.executor = None
+        self.started = time.monotonic()
+        self.in_flight = 0
+        self.counts = {}
+
+    def start_executor(self):
+        """
+        Creates the worker pool. Data must already be loaded so forked
+        workers inherit it.
+        """
+        if self.use_threads:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+            return
+        self.executor = process_pool(self.directory, self.workers)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        """
+        Starts the worker pool and serves until cancelled.
+        """
+        self.start_executor()
+        server = await asyncio.start_server(self.handle, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.shutdown()
+
+    async def handle(self, reader, writer):
+        """
+        Answers requests on one connection until the client closes it or
+        asks not to keep it alive.
+        """
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, version, headers = request
+                status, body = await self.route(method, target)
+                keep_alive = _keep_alive(version, headers)
+                self.counts[status] = self.counts.get(status, 0) + 1
+                writer.write(_response(status, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:
+            writer.write(_response(400, {"error": str(e)}, False))
+        finally:
+            writer.close()
+
+    async def route(self, method, target):
+        if method != "GET":
+            return 405, {"error": f"method not allowed: {method}"}
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values
+                 in parse_qs(url.query, keep_blank_values=True).items()}
+
+        if url.path == "/health":
+            return 200, {"status": "ok"}
+        if url.path == "/stats":
+            return 200, self.stats()
+        if url.path == "/path":
+            return await self.path(query)
+        return 404, {"error": f"no such endpoint: {url.path}"}
+
+    async def path(self, query):
+        source = query.get("source")
+        target = query.get("target")
+        if not source or not target:
+            return 400, {"error": "source and target are required"}
+        by_id = query.get("by", "name") == "id"
+        try:
+            budget = int(query.get("budget", self.budget))
+            timeout = float(query.get("timeout", self.timeout))
+        except ValueError:
+            return 400, {"error": "budget and timeout must be numbers"}
+        # clients may tighten the server's limits but not loosen them
+        budget = min(budget, self.budget)
+        timeout = min(timeout, self.timeout)
+
+        loop = asyncio.get_running_loop()
+        async with self.pending:
+            self.in_flight += 1
+            try:
+                future = loop.run_in_executor(
+                    self.executor, find_path, source, target, by_id, budget)
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                return 504, {"error": f"search timed out after {timeout}s"}
+            except Exception as e:
+                return 500, {"error": f"search failed: {e}"}
+            finally:
+                self.in_flight -= 1
+
+    def stats(self):
+        """
+        Returns server counters. Cache statistics are only meaningful with
+        --threads, since worker processes each keep their own cache.
+        """
+        stats = {
+            "uptime_seconds": time.monotonic() - self.started,
+            "workers": self.workers,
+            "mode": "threads" if self.use_threads else "processes",
+            "in_flight": self.in_flight,
+            "responses": {str(status): count
+                          for status, count in sorted(self.counts.items())},
+            "timeout_seconds": self.timeout,
+            "budget": self.budget,
+        }
+        if self.use_threads:
+            stats["cache"] = degrees.movie_graph.data.path_cache.stats()
+        return stats
+
+
+async def _read_request(reader):
+    """
+    Reads one request head. Returns (method, target, version, headers),
+    or None once the client has closed the connection.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise ValueError("incomplete request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise ValueError("request head too large")
+    if len(head) > MAX_HEADER_BYTES:
+        raise ValueError("request head too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3:
+        raise ValueError(f"malformed request line: {lines[0]!r}")
+    method, target, version = parts
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    if int(headers.get("content-length", 0) or 0):
+        # bodies are not used by any endpoint; drain them to stay in sync
+        await reader.readexactly(int(headers["content-length"]))
+    return method, target, version, headers
+
+
+def _keep_alive(version, headers):
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def _response(status, body, keep_alive):
+    payload = json.dumps(body).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        f"\r\n"
+    )
+    return head.encode("latin-1") + payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve degrees queries.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker count (default: CPU count)")
+    parser.add_argument("--threads", action="store_true",
+                        help="use a thread pool instead of processes")
+    parser.add_argument("--timeout", type=float, default=5.0,
+                        help="per-request timeout in seconds")
+    parser.add_argument("--budget", type=int, default=1000000,
+                        help="maximum people expanded per search")
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory, engine="csr")
+
+    async def serve():
+        server = QueryServer(args.directory, args.workers, args.threads,
+                             args.timeout, args.budget)
+        await server.serve(args.host, args.port)
+
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
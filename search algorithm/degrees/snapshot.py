@@ -0,0 +1,199 @@
+"""
+Versioned binary snapshot of the parsed degrees dataset.
+
+File layout:
+
+    MAGIC | version (u32) | source fingerprint | header length (u32)
+    | JSON header | padding | raw tables, each 8-byte aligned
+
+The fixed-size prefix holds the mtime and size of every source CSV, so a
+stale snapshot is rejected before anything else is read. The header only
+lists the tables with their typecodes and lengths; it is plain JSON, so
+reading a tampered file can fail but never runs code. The tables hold the CSRGraph with its
+connected-component labels, the id columns, and the MetadataTables
+(names, births, titles and years as UTF-8 blobs plus offsets). They are
+memory-mapped and used in place, so reading a snapshot costs no CSV
+parsing, component labelling or decoding of per-row data.
+"""
+
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from csr import CSRGraph
+from tables import (MetadataTables, NumericIds, NumericIndex, StringIndex,
+                    StringTable)
+
+MAGIC = b"DEGSNAP\0"
+VERSION = 4
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# magic, version, (mtime_ns, size) per source, header length
+_PREFIX = struct.Struct("<8sI" + "qq" * len(SOURCES) + "I")
+_GRAPH_TABLES = ("person_offsets", "person_movies", "movie_offsets",
+                 "movie_people", "components")
+_STRING_TABLES = ("person_names", "births", "titles", "years", "name_keys")
+# array typecodes of the tables written: int32, int64 and raw bytes
+_TYPECODES = {"i", "q", "B"}
+
+
+def snapshot_path(directory):
+    """
+    Returns the path of the snapshot kept next to the CSV files.
+    """
+    return os.path.join(directory, "degrees.snapshot")
+
+
+def fingerprint(directory):
+    """
+    Returns (mtime_ns, size, mtime_ns, size, ...) for the source CSVs. A
+    snapshot is only valid while this matches the value recorded when it
+    was written.
+    """
+    result = []
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        result.extend((stat.st_mtime_ns, stat.st_size))
+    return tuple(result)
+
+
+def write_snapshot(path, source_fingerprint, graph, metadata):
+    """
+    Writes the CSRGraph and its MetadataTables to `path` atomically.
+    """
+    if graph.components is None:
+        graph.label_components()
+    tables = [(name, getattr(graph, name)) for name in _GRAPH_TABLES]
+    tables += _id_tables("person_ids", graph.person_ids)
+    tables += _id_tables("movie_ids", graph.movie_ids)
+    for name in _STRING_TABLES:
+        table = getattr(metadata, name)
+        tables += [(f"{name}.blob", table.blob),
+                   (f"{name}.offsets", table.offsets)]
+    tables += [("name_offsets", metadata.name_offsets),
+               ("name_people", metadata.name_people)]
+
+    header = json.dumps({
+        "tables": [(name, getattr(table, "typecode", "B"), len(table))
+                   for name, table in tables],
+    }).encode("utf-8")
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, VERSION, *source_fingerprint,
+                             len(header)))
+        f.write(header)
+        for _, table in tables:
+            f.write(bytes(-f.tell() % 8))
+            f.write(table)
+    os.replace(tmp, path)
+
+
+def read_snapshot(path, source_fingerprint):
+    """
+    Memory-maps the snapshot at `path` and returns (graph, metadata), or
+    None if the file is missing, from another version, stale with
+    respect to `source_fingerprint`, truncated or corrupt.
+    """
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    with f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            return None
+
+    # any malformed field means a corrupt file: rebuild rather than fail
+    try:
+        return _read_tables(data, source_fingerprint)
+    except Exception:
+        return None
+
+
+def _read_tables(data, source_fingerprint):
+    if len(data) < _PREFIX.size:
+        return None
+    magic, version, *recorded, header_length = _PREFIX.unpack_from(data)
+    if (magic != MAGIC or version != VERSION
+            or tuple(recorded) != tuple(source_fingerprint)):
+        return None
+
+    # the tables reference the mapping directly, so it is never closed
+    view = memoryview(data)
+    start = _PREFIX.size
+    if start + header_length > len(data):
+        return None
+    header = json.loads(str(view[start:start + header_length], "utf-8"))
+    offset = start + header_length
+    tables = {}
+    for name, typecode, length in header["tables"]:
+        if (typecode not in _TYPECODES or type(length) is not int
+                or length < 0):
+            return None
+        offset += -offset % 8
+        size = length * struct.calcsize(typecode)
+        if offset + size > len(data):
+            return None
+        tables[name] = view[offset:offset + size].cast(typecode)
+        offset += size
+    return _from_tables(tables)
+
+
+def _from_tables(tables):
+    person_ids, person_index = _ids(tables, "person_ids")
+    movie_ids, movie_index = _ids(tables, "movie_ids")
+    people, movies = len(person_ids), len(movie_ids)
+    # table lengths that fit the file but not each other
+    if (len(tables["person_offsets"]) != people + 1
+            or len(tables["movie_offsets"]) != movies + 1
+            or len(tables["person_movies"]) != tables["person_offsets"][-1]
+            or len(tables["movie_people"]) != tables["movie_offsets"][-1]
+            or len(tables["components"]) != people
+            or len(tables["name_people"]) != people):
+        return None
+    for name in _STRING_TABLES:
+        table = _string_table(tables, name)
+        if table.offsets[-1] != len(table.blob):
+            return None
+    graph = CSRGraph(person_ids, movie_ids,
+                     *(tables[name] for name in _GRAPH_TABLES[:4]),
+                     person_index, movie_index,
+                     components=tables["components"])
+    metadata = MetadataTables(
+        person_ids, person_index, movie_ids, movie_index,
+        *(_string_table(tables, name) for name in _STRING_TABLES),
+        tables["name_offsets"], tables["name_people"])
+    return graph, metadata
+
+
+def _id_tables(name, ids):
+    """
+    Returns the tables storing an id column: the int64 values of numeric
+    ids, or the strings plus their indexes in sorted order.
+    """
+    if isinstance(ids, NumericIds):
+        return [(name, ids.values)]
+    table = StringTable.from_strings(ids)
+    order = array("i", sorted(range(len(ids)), key=ids.__getitem__))
+    return [(f"{name}.blob", table.blob), (f"{name}.offsets", table.offsets),
+            (f"{name}.order", order)]
+
+
+def _ids(tables, name):
+    if name in tables:
+        values = tables[name]
+        return NumericIds(values), NumericIndex(values)
+    ids = _string_table(tables, name)
+    order = tables[f"{name}.order"]
+    if ids.offsets[-1] != len(ids.blob) or len(order) != len(ids):
+        raise ValueError(f"inconsistent {name} table")
+    return ids, StringIndex(ids, order)
+
+
+def _string_table(tables, name):
+    return StringTable(tables[f"{name}.blob"], tables[f"{name}.offsets"])
@@ -0,0 +1,316 @@
+"""
+Streaming, low-memory loader for large degrees datasets.
+
+Only the graph structure stays in memory, built by CSRGraph.from_csv
+with person and movie ids kept as sorted int64 arrays when they are
+numeric, as in the IMDb dumps. Names, birth years,
+titles and release years are streamed in chunks into an on-disk SQLite
+lookup that is only read when a path is printed or a name resolved.
+
+The store records the mtime and size of the source CSVs, like the
+snapshot, and is reused as long as they have not changed. When the data
+directory is read-only it is kept in the system temp directory instead.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+from csr import CSRGraph
+from nameindex import NameIndex
+from snapshot import fingerprint
+from tables import csv_columns
+
+# stored as the SQLite user_version; stores of another version are rebuilt
+VERSION = 1
+
+
+class MetadataStore():
+    """
+    On-disk lookup of person and movie metadata backed by SQLite.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        # final location and source fingerprint while the store is being
+        # built, see create
+        self.target = None
+        self.source_fingerprint = None
+
+    @classmethod
+    def open(cls, path, source_fingerprint):
+        """
+        Returns the finished store at `path` if it was built from sources
+        matching `source_fingerprint`, otherwise None.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            store = cls(path)
+        except sqlite3.Error:
+            return None
+        try:
+            with store.lock:
+                version = store.connection.execute(
+                    "PRAGMA user_version").fetchone()[0]
+                row = store.connection.execute(
+                    "SELECT fingerprint FROM source").fetchone()
+            if (version == VERSION and row is not None
+                    and json.loads(row[0]) == list(source_fingerprint)):
+                return store
+        except (sqlite3.Error, ValueError):
+            # another version, a half-written or not a SQLite file
+            pass
+        store.close()
+        return None
+
+    @classmethod
+    def create(cls, path, source_fingerprint=()):
+        """
+        Creates an empty store that finish() moves to `path`. Rows are
+        written to a fresh file next to it and swapped in with a rename,
+        so a store already open at `path` keeps reading its own file.
+        `source_fingerprint` is recorded by finish() for open().
+        """
+        tmp = f"{path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        store = cls(tmp)
+        store.target = path
+        store.source_fingerprint = list(source_fingerprint)
+        store.connection.executescript(f"""
+            PRAGMA user_version = {VERSION};
+            CREATE TABLE people (id TEXT PRIMARY KEY, name TEXT,
+                                 lower_name TEXT, birth TEXT);
+            CREATE TABLE movies (id TEXT PRIMARY KEY, title TEXT, year TEXT);
+            CREATE TABLE source (fingerprint TEXT);
+        """)
+        return store
+
+    def add_people(self, rows):
+        """
+        Inserts (id, name, birth) rows.
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO people VALUES (?, ?, ?, ?)",
+                ((pid, name, name.lower(), birth) for pid, name, birth in rows))
+
+    def add_movies(self, rows):
+        """
+        Inserts (id, title, year) rows.
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO movies VALUES (?, ?, ?)", rows)
+
+    def finish(self):
+        """
+        Builds the name index once all rows are in and, for a store made
+        by create, moves it into place.
+        """
+        with self.lock:
+            with self.connection:
+                self.connection.execute(
+                    "CREATE INDEX IF NOT EXISTS people_lower_name "
+                    "ON people (lower_name)")
+                if self.target is not None:
+                    # written last, so only a complete store matches
+                    self.connection.execute(
+                        "INSERT INTO source VALUES (?)",
+                        (json.dumps(self.source_fingerprint),))
+            if self.target is not None:
+                self.connection.close()
+                os.replace(self.path, self.target)
+                self.path, self.target = self.target, None
+                self.connection = sqlite3.connect(self.path,
+                                                  check_same_thread=False)
+
+    def person(self, person_id):
+        """
+        Returns {"name", "birth"} for a person id, or None.
+        """
+        row = self._one("SELECT name, birth FROM people WHERE id = ?",
+                        person_id)
+        return None if row is None else {"name": row[0], "birth": row[1]}
+
+    def movie(self, movie_id):
+        """
+        Returns {"title", "year"} for a movie id, or None.
+        """
+        row = self._one("SELECT title, year FROM movies WHERE id = ?",
+                        movie_id)
+        return None if row is None else {"title": row[0], "year": row[1]}
+
+    def person_ids_for_name(self, name):
+        """
+        Returns the set of person ids whose name matches, ignoring case.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id FROM people WHERE lower_name = ?",
+                (name.lower(),)).fetchall()
+        return {row[0] for row in rows}
+
+    def names(self):
+        """
+        Yields every distinct lowercased person name.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT lower_name FROM people").fetchall()
+        return (row[0] for row in rows)
+
+    def name_index(self):
+        """
+        Returns a NameIndex over every stored name.
+        """
+        return NameIndex(self.names(), self.person_ids_for_name)
+
+    def movie_years(self):
+        """
+        Returns (movie_id, year) for every movie.
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT id, year FROM movies").fetchall()
+
+    def close(self):
+        self.connection.close()
+
+    def _one(self, query, key):
+        with self.lock:
+            return self.connection.execute(query, (key,)).fetchone()
+
+
+class MetadataOverlay():
+    """
+    Read-only view of a metadata store with extra people and movies
+    layered on top. Updates go into a new overlay, so the shared store
+    and any GraphData still reading it are never written to.
+    """
+
+    def __init__(self, base, people=(), movies=()):
+        self.base = base
+        # person_id -> (name, birth) and movie_id -> (title, year)
+        self.people = {pid: (name, birth) for pid, name, birth in people}
+        self.movies = {mid: (title, year) for mid, title, year in movies}
+        # lowercased name -> set of added person ids
+        self.added_names = {}
+        for person_id, (name, _) in self.people.items():
+            self.added_names.setdefault(name.lower(), set()).add(person_id)
+
+    @classmethod
+    def over(cls, metadata, people=(), movies=()):
+        """
+        Returns `metadata` with (id, name, birth) people and
+        (id, title, year) movies added, flattening nested overlays.
+        """
+        if isinstance(metadata, MetadataOverlay):
+            people = [(pid, name, birth) for pid, (name, birth)
+                      in metadata.people.items()] + list(people)
+            movies = [(mid, title, year) for mid, (title, year)
+                      in metadata.movies.items()] + list(movies)
+            metadata = metadata.base
+        return cls(metadata, people, movies)
+
+    def person(self, person_id):
+        row = self.people.get(person_id)
+        if row is None:
+            return self.base.person(person_id)
+        return {"name": row[0], "birth": row[1]}
+
+    def movie(self, movie_id):
+        row = self.movies.get(movie_id)
+        if row is None:
+            return self.base.movie(movie_id)
+        return {"title": row[0], "year": row[1]}
+
+    def person_ids_for_name(self, name):
+        return (self.base.person_ids_for_name(name)
+                | self.added_names.get(name.lower(), set()))
+
+    def name_index(self):
+        return self.base.name_index().extended(self.added_names,
+                                               self.person_ids_for_name)
+
+    def movie_years(self):
+        return list(self.base.movie_years()) + [
+            (movie_id, year) for movie_id, (_, year) in self.movies.items()]
+
+    def close(self):
+        self.base.close()
+
+
+def metadata_paths(directory):
+    """
+    Returns the default store locations for a data directory: next to the
+    CSVs, then a per-directory file in the system temp directory for when
+    the data directory is read-only.
+    """
+    key = hashlib.sha1(os.path.abspath(directory).encode("utf-8"))
+    return [os.path.join(directory, "degrees.meta.sqlite"),
+            os.path.join(tempfile.gettempdir(),
+                         f"degrees.meta.{key.hexdigest()[:16]}.sqlite")]
+
+
+def load_streaming(directory, metadata_path=None, chunk_size=10000,
+                   reuse=True):
+    """
+    Streams the three CSV files and returns (graph, metadata): a CSRGraph
+    holding only the structure, and a MetadataStore at `metadata_path`
+    (default: see metadata_paths).
+
+    With reuse=True a store built from unchanged CSVs is opened as it is
+    instead of being filled again.
+    """
+    if metadata_path is None:
+        paths = metadata_paths(directory)
+    else:
+        paths = [metadata_path]
+    source_fingerprint = fingerprint(directory)
+    graph = CSRGraph.from_csv(directory)
+
+    if reuse:
+        for path in paths:
+            metadata = MetadataStore.open(path, source_fingerprint)
+            if metadata is not None:
+                return graph, metadata
+
+    for path in paths:
+        try:
+            metadata = MetadataStore.create(path, source_fingerprint)
+            break
+        except (OSError, sqlite3.Error):
+            # read-only location: try the next one
+            if path == paths[-1]:
+                raise
+    _stream_rows(os.path.join(directory, "people.csv"),
+                 ("id", "name", "birth"), metadata.add_people, chunk_size)
+    _stream_rows(os.path.join(directory, "movies.csv"),
+                 ("id", "title", "year"), metadata.add_movies, chunk_size)
+    metadata.finish()
+    return graph, metadata
+
+
+def _stream_rows(path, fields, sink, chunk_size):
+    """
+    Reads `fields` from a CSV, handing rows to `sink` in chunks.
+    """
+    chunk = []
+    with open(path, encoding="utf-8") as f:
+        reader = csv.reader(f)
+        columns = csv_columns(next(reader), fields)
+        for row in reader:
+            chunk.append(tuple(row[column] for column in columns))
+            if len(chunk) >= chunk_size:
+                sink(chunk)
+                chunk = []
+    if chunk:
+        sink(chunk)
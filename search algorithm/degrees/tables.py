@@ -0,0 +1,361 @@
+"""
+Compact tables for ids and metadata of the degrees dataset.
+
+Ids are read into sorted int64 arrays when they are plain numbers (as in
+the IMDb dumps), and names, birth years, titles and release years are
+packed into StringTables: one UTF-8 blob plus an offsets array per
+column, indexed like the CSRGraph. Together they replace the per-row
+dicts of the dict engine at a few bytes per entry.
+"""
+
+import csv
+import gc
+import os
+from array import array
+from bisect import bisect_left
+
+from nameindex import NameIndex
+
+# ids that fit in a signed 64-bit int without losing leading zeros
+_MAX_DIGITS = 18
+
+
+class NumericIds():
+    """
+    Sequence view of a sorted int64 array of ids: index -> string id.
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return str(self.values[index])
+
+    def __iter__(self):
+        return (str(value) for value in self.values)
+
+
+class NumericIndex():
+    """
+    Mapping view of a sorted int64 array of ids: string id -> index,
+    answered by binary search instead of a dict.
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    def __getitem__(self, key):
+        index = self.get(key)
+        if index is None:
+            raise KeyError(key)
+        return index
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        if not _is_numeric(key):
+            return default
+        value = int(key)
+        index = bisect_left(self.values, value)
+        if index < len(self.values) and self.values[index] == value:
+            return index
+        return default
+
+
+class StringIndex():
+    """
+    Mapping view of a StringTable of ids: string id -> index, answered by
+    binary search over `order`, the indexes sorted by id.
+    """
+
+    def __init__(self, ids, order):
+        self.ids = ids
+        self.order = order
+
+    def __getitem__(self, key):
+        index = self.get(key)
+        if index is None:
+            raise KeyError(key)
+        return index
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        ids = self.ids
+        order = self.order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ids[order[mid]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order) and ids[order[lo]] == key:
+            return order[lo]
+        return default
+
+
+class StringTable():
+    """
+    Sequence of strings stored as one UTF-8 blob and an int64 offsets
+    array: string i is blob[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        blob = bytearray()
+        offsets = array("q", [0])
+        for string in strings:
+            blob += string.encode("utf-8")
+            offsets.append(len(blob))
+        return cls(blob, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        offsets = self.offsets
+        return str(self.blob[offsets[index]:offsets[index + 1]], "utf-8")
+
+    def __iter__(self):
+        blob = self.blob
+        offsets = self.offsets
+        for index in range(len(offsets) - 1):
+            yield str(blob[offsets[index]:offsets[index + 1]], "utf-8")
+
+
+class MetadataTables():
+    """
+    In-memory person and movie metadata for the csr engine, read lazily
+    out of StringTables by person_info / movie_info. It answers the same
+    queries as stream.MetadataStore.
+
+    Distinct lowercased names are kept sorted in `name_keys`, and the
+    people holding each one in a CSR table (`name_offsets` into
+    `name_people`), so name lookups are binary searches.
+    """
+
+    def __init__(self, person_ids, person_index, movie_ids, movie_index,
+                 person_names, births, titles, years,
+                 name_keys, name_offsets, name_people):
+        self.person_ids = person_ids
+        self.person_index = person_index
+        self.movie_ids = movie_ids
+        self.movie_index = movie_index
+        # StringTables indexed like the graph's person and movie ids
+        self.person_names = person_names
+        self.births = births
+        self.titles = titles
+        self.years = years
+        self.name_keys = name_keys
+        self.name_offsets = name_offsets
+        self.name_people = name_people
+
+    @classmethod
+    def from_csv(cls, directory, graph):
+        """
+        Reads the metadata of every person and movie in `graph` from the
+        CSV files. The first row wins for a repeated id.
+        """
+        person_names, births = _read_columns(
+            os.path.join(directory, "people.csv"), ("id", "name", "birth"),
+            graph.person_index, len(graph.person_ids))
+        titles, years = _read_columns(
+            os.path.join(directory, "movies.csv"), ("id", "title", "year"),
+            graph.movie_index, len(graph.movie_ids))
+
+        lowered = [name.lower() for name in person_names]
+        # stable sort: people sharing a name stay in index order
+        order = sorted(range(len(lowered)), key=lowered.__getitem__)
+        keys = []
+        name_offsets = array("q")
+        for position, person in enumerate(order):
+            key = lowered[person]
+            if not keys or keys[-1] != key:
+                keys.append(key)
+                name_offsets.append(position)
+        name_offsets.append(len(order))
+
+        return cls(graph.person_ids, graph.person_index,
+                   graph.movie_ids, graph.movie_index,
+                   StringTable.from_strings(person_names),
+                   StringTable.from_strings(births),
+                   StringTable.from_strings(titles),
+                   StringTable.from_strings(years),
+                   StringTable.from_strings(keys), name_offsets,
+                   array("i", order))
+
+    def to_indexes(self, graph):
+        """
+        Builds the dict engine's names, people and movies dicts from these
+        tables and the credits in `graph`.
+        """
+        # about a million new containers and no cycles: pause the cyclic
+        # collector, which would otherwise rescan them over and over
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._to_indexes(graph)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _to_indexes(self, graph):
+        # decode every id once instead of once per credit
+        person_ids = list(self.person_ids)
+        movie_ids = list(self.movie_ids)
+        names = {}
+        name_offsets = self.name_offsets
+        name_people = self.name_people
+        for position, key in enumerate(self.name_keys):
+            names[key] = {
+                person_ids[person] for person in
+                name_people[name_offsets[position]:name_offsets[position + 1]]}
+        people = {}
+        for person, (person_id, name, birth) in enumerate(
+                zip(person_ids, self.person_names, self.births)):
+            people[person_id] = {
+                "name": name,
+                "birth": birth,
+                "movies": {movie_ids[movie]
+                           for movie in graph.movies_for(person)},
+            }
+        movies = {}
+        for movie, (movie_id, title, year) in enumerate(
+                zip(movie_ids, self.titles, self.years)):
+            movies[movie_id] = {
+                "title": title,
+                "year": year,
+                "stars": {person_ids[person]
+                          for person in graph.stars_for(movie)},
+            }
+        return names, people, movies
+
+    def person(self, person_id):
+        """
+        Returns {"name", "birth"} for a person id, or None.
+        """
+        index = self.person_index.get(person_id)
+        if index is None:
+            return None
+        return {"name": self.person_names[index], "birth": self.births[index]}
+
+    def movie(self, movie_id):
+        """
+        Returns {"title", "year"} for a movie id, or None.
+        """
+        index = self.movie_index.get(movie_id)
+        if index is None:
+            return None
+        return {"title": self.titles[index], "year": self.years[index]}
+
+    def person_ids_for_name(self, name):
+        """
+        Returns the set of person ids whose name matches, ignoring case.
+        """
+        key = name.lower()
+        keys = self.name_keys
+        position = bisect_left(keys, key)
+        if position == len(keys) or keys[position] != key:
+            return set()
+        start = self.name_offsets[position]
+        end = self.name_offsets[position + 1]
+        return {self.person_ids[person]
+                for person in self.name_people[start:end]}
+
+    def name_index(self):
+        """
+        Returns a NameIndex reading the sorted name table in place.
+        """
+        return NameIndex.from_sorted(self.name_keys, self.person_ids_for_name)
+
+    def movie_years(self):
+        """
+        Returns (movie_id, year) for every movie.
+        """
+        return zip(self.movie_ids, self.years)
+
+    def close(self):
+        pass
+
+
+def read_ids(path):
+    """
+    Reads the id column of a CSV and returns the (ids, index) pair for it:
+    NumericIds / NumericIndex over sorted int64 values when every id is a
+    plain decimal number, otherwise a list and dict in file order.
+    Repeated ids are kept once.
+    """
+    numeric = array("q")
+    ordered = True
+    strings = None
+
+    with open(path, encoding="utf-8") as f:
+        reader = csv.reader(f)
+        column = csv_columns(next(reader), ("id",))[0]
+        for row in reader:
+            key = row[column]
+            if strings is not None:
+                strings.append(key)
+            elif _is_numeric(key):
+                value = int(key)
+                if numeric and value <= numeric[-1]:
+                    ordered = False
+                numeric.append(value)
+            else:
+                # non-numeric ids: fall back to a plain list and dict
+                strings = [str(value) for value in numeric] + [key]
+                numeric = None
+
+    if strings is not None:
+        strings = list(dict.fromkeys(strings))
+        return strings, {key: i for i, key in enumerate(strings)}
+
+    if not ordered:
+        numeric = array("q", sorted(set(numeric)))
+    return NumericIds(numeric), NumericIndex(numeric)
+
+
+def csv_columns(header, fields):
+    """
+    Returns the positions of `fields` in a CSV header row.
+    """
+    return [header.index(field) for field in fields]
+
+
+def _read_columns(path, fields, index, size):
+    """
+    Reads the columns after the id in `fields` into lists of `size`
+    strings ordered by `index`; ids missing from it are skipped.
+    """
+    columns = [[""] * size for _ in fields[1:]]
+    seen = bytearray(size)
+    with open(path, encoding="utf-8") as f:
+        reader = csv.reader(f)
+        positions = csv_columns(next(reader), fields)
+        for row in reader:
+            i = index.get(row[positions[0]])
+            if i is None or seen[i]:
+                continue
+            seen[i] = 1
+            for column, position in zip(columns, positions[1:]):
+                column[i] = row[position]
+    return columns
+
+
+def _is_numeric(key):
+    return (key.isascii() and key.isdigit() and len(key) <= _MAX_DIGITS
+            and (key == "0" or key[0] != "0"))
@@ -0,0 +1,50 @@
+"""
+Checks PathCache: both directions share an entry, capacity evicts the
+least recently used pair, and callers can never change a cached path.
+
+Usage: python -m unittest test_cache
+"""
+
+import unittest
+
+from cache import NOT_CONNECTED, PathCache
+
+PATH = [("m1", "b"), ("m2", "c")]
+
+
+class PathCacheTest(unittest.TestCase):
+    def test_both_directions(self):
+        cache = PathCache()
+        cache.put("a", "c", PATH)
+        self.assertEqual(cache.get("a", "c"), PATH)
+        self.assertEqual(cache.get("c", "a"), [("m2", "b"), ("m1", "a")])
+        self.assertEqual(cache.stats()["size"], 1)
+
+    def test_not_connected(self):
+        cache = PathCache()
+        cache.put("a", "z", NOT_CONNECTED)
+        self.assertIs(cache.get("z", "a"), NOT_CONNECTED)
+
+    def test_eviction(self):
+        cache = PathCache(capacity=2)
+        cache.put("a", "b", [])
+        cache.put("a", "c", [])
+        cache.get("a", "b")
+        cache.put("a", "d", [])
+        self.assertIsNone(cache.get("a", "c"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        cache.resize(1)
+        self.assertEqual(cache.stats()["size"], 1)
+
+    def test_copies(self):
+        cache = PathCache()
+        path = list(PATH)
+        cache.put("a", "c", path)
+        path.append(("m3", "d"))
+        cache.get("a", "c").clear()
+        cache.get("c", "a").clear()
+        self.assertEqual(cache.get("a", "c"), PATH)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Checks that LandmarkIndex.bounds brackets the true degrees of separation,
+including people further from every landmark than a byte can hold.
+
+Usage: python -m unittest test_landmarks
+"""
+
+import os
+import unittest
+
+from csr import CSRGraph
+from landmarks import FAR, LandmarkIndex
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+def chain(length):
+    """
+    Returns a graph of `length` people in a line, each sharing one movie
+    with the next.
+    """
+    edges = []
+    for movie in range(length - 1):
+        edges += [(movie, movie), (movie + 1, movie)]
+    return CSRGraph.from_edges([str(p) for p in range(length)],
+                               [str(m) for m in range(length - 1)], edges)
+
+
+class LandmarkTest(unittest.TestCase):
+    def check(self, graph, index, sources):
+        for source in sources:
+            distance = graph.distances_from(source).distance
+            for target, true in enumerate(distance):
+                lower, upper = index.bounds(source, target)
+                if true == -1:
+                    self.assertEqual((lower, upper), (None, None))
+                    continue
+                self.assertLessEqual(lower, true)
+                if upper is not None:
+                    self.assertGreaterEqual(upper, true)
+
+    def test_small(self):
+        graph = CSRGraph.from_csv(SMALL)
+        index = LandmarkIndex.build(graph, count=3)
+        self.check(graph, index, range(len(graph.person_ids)))
+
+    def test_beyond_a_byte(self):
+        graph = chain(700)
+        # the landmark is person 1, more than FAR degrees from the far end
+        index = LandmarkIndex.build(graph, count=1)
+        self.assertEqual(index.landmarks, [1])
+        self.assertEqual(index.bounds(0, 699), (FAR - 1, None))
+        self.check(graph, index, (0, 5, 350, 699))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Checks that every search mode and engine agrees with the original
+one-sided BFS: bidirectional search, the CSR graph and the csr and
+stream engines all find paths of the same length, and every path they
+return is a valid chain of shared movies.
+
+Usage: python -m unittest test_moviegraph
+"""
+
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from bench import generate
+from moviegraph import GraphData
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+def baseline(data, source, target):
+    """
+    Returns the one-sided BFS path, or None when there is none.
+    """
+    try:
+        return data.breadth_first_path(source, target)
+    except Exception as e:
+        if e.args != ("no solution",):
+            raise
+        return None
+
+
+class EquivalenceTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # the stream engine writes its store next to the CSVs
+        cls.small = tempfile.mkdtemp()
+        for name in ("people.csv", "movies.csv", "stars.csv"):
+            shutil.copy(os.path.join(SMALL, name), cls.small)
+        cls.generated = tempfile.mkdtemp()
+        generate(cls.generated, people=400, movies=150, seed=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.small)
+        shutil.rmtree(cls.generated)
+
+    def assertValidPath(self, data, source, target, path):
+        person = source
+        for movie, next_person in path:
+            self.assertIn((movie, next_person),
+                          data.neighbors_for_person(person))
+            person = next_person
+        self.assertEqual(person, target)
+
+    def check(self, directory, pairs):
+        reference = GraphData.load(directory, use_snapshot=False)
+        engines = [GraphData.load(directory, engine, use_snapshot=False)
+                   for engine in ("csr", "stream")]
+        for source, target in pairs:
+            expected = baseline(reference, source, target)
+            if expected is None:
+                self.assertFalse(reference.connected(source, target))
+                for data in [reference] + engines:
+                    with self.assertRaises(Exception):
+                        data.shortest_path(source, target, use_cache=False)
+                continue
+            self.assertValidPath(reference, source, target, expected)
+            for data in [reference] + engines:
+                for bidirectional in (True, False):
+                    path = data.shortest_path(source, target, bidirectional,
+                                              use_cache=False)
+                    self.assertEqual(len(path), len(expected),
+                                     (data.engine, source, target))
+                    self.assertValidPath(reference, source, target, path)
+        for data in engines:
+            data.metadata.close()
+
+    def test_small(self):
+        people = list(GraphData.load(self.small, use_snapshot=False).people)
+        self.check(self.small, itertools.product(people, repeat=2))
+
+    def test_generated(self):
+        data = GraphData.load(self.generated, use_snapshot=False)
+        people = sorted(data.people)
+        rng = random.Random(0)
+        self.check(self.generated,
+                   [(rng.choice(people), rng.choice(people))
+                    for _ in range(300)])
+
+
+if __name__ == "__main__":
+    unittest.main()
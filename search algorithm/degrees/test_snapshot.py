@@ -0,0 +1,85 @@
+"""
+Checks that read_snapshot round-trips the small dataset and returns None,
+rather than raising, for truncated or corrupted files.
+
+Usage: python -m unittest test_snapshot
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import snapshot
+from csr import CSRGraph
+from tables import MetadataTables
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in snapshot.SOURCES:
+            shutil.copy(os.path.join(SMALL, name), self.directory)
+        self.fingerprint = snapshot.fingerprint(self.directory)
+        self.graph = CSRGraph.from_csv(self.directory)
+        self.metadata = MetadataTables.from_csv(self.directory, self.graph)
+        self.path = snapshot.snapshot_path(self.directory)
+        snapshot.write_snapshot(self.path, self.fingerprint, self.graph,
+                                self.metadata)
+        with open(self.path, "rb") as f:
+            self.data = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+        return snapshot.read_snapshot(self.path, self.fingerprint)
+
+    def test_round_trip(self):
+        graph, metadata = snapshot.read_snapshot(self.path, self.fingerprint)
+        self.assertEqual(list(graph.person_ids), list(self.graph.person_ids))
+        self.assertEqual(list(graph.movie_people),
+                         list(self.graph.movie_people))
+        self.assertEqual(metadata.person("102"), self.metadata.person("102"))
+        self.assertEqual(metadata.person_ids_for_name("Tom Cruise"),
+                         {"129"})
+
+    def test_stale(self):
+        stale = tuple(value + 1 for value in self.fingerprint)
+        self.assertIsNone(snapshot.read_snapshot(self.path, stale))
+
+    def test_truncated(self):
+        for length in (0, 10, snapshot._PREFIX.size, len(self.data) - 1):
+            self.assertIsNone(self.read(self.data[:length]))
+
+    def test_corrupt_header(self):
+        # flip 1-3 bytes of the prefix's length field or the header
+        start = snapshot._PREFIX.size - 4
+        header_length = int.from_bytes(self.data[start:start + 4], "little")
+        end = snapshot._PREFIX.size + header_length
+        rng = random.Random(0)
+        for _ in range(500):
+            data = bytearray(self.data)
+            for _ in range(rng.randint(1, 3)):
+                data[rng.randrange(start, end)] ^= 1 << rng.randrange(8)
+            result = self.read(bytes(data))
+            if result is not None:
+                graph, metadata = result
+                self.assertEqual(len(graph.person_offsets),
+                                 len(graph.person_ids) + 1)
+
+    def test_foreign_header(self):
+        # a header naming a module must not be imported
+        header = b'{"tables": [["os.system", "q", 1]]}'
+        prefix = snapshot._PREFIX.pack(snapshot.MAGIC, snapshot.VERSION,
+                                       *self.fingerprint, len(header))
+        self.assertIsNone(self.read(prefix + header + bytes(8)))
+
+
+if __name__ == "__main__":
+    unittest.main()
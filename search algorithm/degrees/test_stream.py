@@ -0,0 +1,71 @@
+"""
+Checks that the stream engine's metadata store is reused while the CSVs
+are unchanged, rebuilt when they change, and kept elsewhere when the
+default location cannot be written.
+
+Usage: python -m unittest test_stream
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import stream
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+class MetadataStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ("people.csv", "movies.csv", "stars.csv"):
+            shutil.copy(os.path.join(SMALL, name), self.directory)
+        self.path = os.path.join(self.directory, "meta.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def load(self, **options):
+        options.setdefault("metadata_path", self.path)
+        metadata = stream.load_streaming(self.directory, **options)[1]
+        self.addCleanup(metadata.close)
+        return metadata
+
+    def test_reused(self):
+        self.load()
+        built = os.stat(self.path).st_mtime_ns
+        metadata = self.load()
+        self.assertEqual(os.stat(self.path).st_mtime_ns, built)
+        self.assertEqual(metadata.person("129"),
+                         {"name": "Tom Cruise", "birth": "1962"})
+
+    def test_rebuilt(self):
+        self.load()
+        store = stream.MetadataStore.open(self.path,
+                                          stream.fingerprint(self.directory))
+        self.assertIsNotNone(store)
+        store.close()
+        with open(os.path.join(self.directory, "people.csv"), "a") as f:
+            f.write('999,"New Person",2000\n')
+        metadata = self.load()
+        self.assertEqual(metadata.person_ids_for_name("new person"), {"999"})
+        self.load(reuse=False)
+
+    def test_not_a_store(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a database" * 100)
+        self.assertEqual(self.load().movie("112384")["title"], "Apollo 13")
+
+    def test_unwritable_location(self):
+        missing = os.path.join(self.directory, "missing", "meta.sqlite")
+        fallback = os.path.join(self.directory, "fallback.sqlite")
+        paths = stream.metadata_paths
+        stream.metadata_paths = lambda directory: [missing, fallback]
+        self.addCleanup(setattr, stream, "metadata_paths", paths)
+        self.assertEqual(self.load(metadata_path=None).path, fallback)
+        self.assertEqual(self.load(metadata_path=None).path, fallback)
+
+
+if __name__ == "__main__":
+    unittest.main()
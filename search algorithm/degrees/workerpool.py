@@ -0,0 +1,29 @@
+"""
+Process pools whose workers answer degrees queries.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import degrees
+
+
+def process_pool(directory, workers):
+    """
+    Returns a ProcessPoolExecutor with `workers` processes that can call
+    the degrees module. Where fork is available the workers inherit the
+    data the caller has already loaded; otherwise each one loads
+    `directory` itself with engine="csr".
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context(
+        "fork" if "fork" in methods else None)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                               initializer=_load_worker,
+                               initargs=(directory,))
+
+
+def _load_worker(directory):
+    # only runs when the pool cannot fork and inherit the parent's data
+    if degrees.movie_graph.data is None:
+        degrees.load_data(directory, engine="csr")
@@ -0,0 +1,69 @@
+"""
+Background AI move computation.
+
+MoveWorker runs a search function (tictactoe.minimax by default) on a
+single background thread or process and hands back a Future, so a
+caller such as the pygame loop in runner.py can keep drawing and poll
+future.done() instead of blocking. Headless code can simply call
+future.result().
+
+A search that has already started cannot be interrupted, so cancel()
+drops the pending request: its result is discarded and the next
+request is not delayed behind a queue of stale ones.
+"""
+
+import copy
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import tictactoe as ttt
+
+
+class MoveWorker():
+    def __init__(self, search=ttt.minimax, use_process=False):
+        """
+        `search(board)` returns the move to play. With use_process the
+        search runs in a separate process, which keeps CPU-heavy searches
+        from competing with the caller for the GIL; `search` must then be
+        a picklable module-level function.
+        """
+        self.search = search
+        if use_process:
+            self.executor = ProcessPoolExecutor(max_workers=1)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        self.future = None
+
+    def request(self, board):
+        """
+        Starts searching for a move on the board and returns its Future.
+        Any earlier request that is still pending is cancelled.
+        """
+        self.cancel()
+        # the caller keeps its own board, so search a private copy
+        self.future = self.executor.submit(self.search, copy.deepcopy(board))
+        return self.future
+
+    def thinking(self):
+        """
+        Returns True while the latest request has not finished.
+        """
+        return self.future is not None and not self.future.done()
+
+    def cancel(self):
+        """
+        Abandons the latest request. It is cancelled outright if it has
+        not started; otherwise it finishes in the background unobserved.
+        """
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -0,0 +1,202 @@
+"""
+Compact Tic Tac Toe board engine.
+
+A board is a pair of 9-bit masks (x, o), one bit per square, with
+square (i, j) at bit 3 * i + j. Moves are a single OR, the player to
+move is a popcount comparison and wins are checked against the eight
+precomputed winning-line masks, so nothing is copied or flattened.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+# (i, j) action for each bit index, and the bit for each action
+CELLS = [(i, j) for i in range(3) for j in range(3)]
+BITS = {cell: 1 << index for index, cell in enumerate(CELLS)}
+
+WIN_MASKS = (
+    # rows
+    0b000000111, 0b000111000, 0b111000000,
+    # columns
+    0b001001001, 0b010010010, 0b100100100,
+    # diagonals
+    0b100010001, 0b001010100,
+)
+
+# the eight rotations and reflections of the board as (i, j) -> (i, j)
+_TRANSFORMS = (
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i),
+)
+
+# SYMMETRIES[s][index] is where square `index` moves under symmetry s
+SYMMETRIES = [
+    [3 * a + b for a, b in (transform(i, j) for i, j in CELLS)]
+    for transform in _TRANSFORMS
+]
+INVERSE = [
+    next(t for t, back in enumerate(SYMMETRIES)
+         if all(back[perm[index]] == index for index in range(9)))
+    for perm in SYMMETRIES
+]
+
+
+def _permute(mask, perm):
+    permuted = 0
+    for index in range(9):
+        if mask >> index & 1:
+            permuted |= 1 << perm[index]
+    return permuted
+
+
+# every 9-bit mask precomputed under every symmetry
+_MASK_TABLES = [[_permute(mask, perm) for mask in range(FULL + 1)]
+                for perm in SYMMETRIES]
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return (0, 0)
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = board
+    return X if bin(x).count("1") == bin(o).count("1") else O
+
+
+def actions(board):
+    """
+    Returns the list of all possible actions (i, j) available on the board,
+    in row-major order.
+    """
+    occupied = board[0] | board[1]
+    return [cell for index, cell in enumerate(CELLS)
+            if not occupied >> index & 1]
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    if action is None:
+        raise Exception("error")
+    x, o = board
+    bit = BITS[action]
+    if (x | o) & bit:
+        raise Exception("square already taken")
+    if player(board) == X:
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def has_line(mask):
+    """
+    Returns True if the mask contains a complete winning line.
+    """
+    for line in WIN_MASKS:
+        if mask & line == line:
+            return True
+    return False
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if has_line(board[0]):
+        return X
+    if has_line(board[1]):
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = board
+    return (x | o) == FULL or has_line(x) or has_line(o)
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    if has_line(board[0]):
+        return 1
+    if has_line(board[1]):
+        return -1
+    return 0
+
+
+def from_board(board):
+    """
+    Converts a nested-list board into an (x, o) bitboard.
+    """
+    x = o = 0
+    for index, (i, j) in enumerate(CELLS):
+        if board[i][j] == X:
+            x |= 1 << index
+        elif board[i][j] == O:
+            o |= 1 << index
+    return (x, o)
+
+
+def to_board(board):
+    """
+    Converts an (x, o) bitboard into the nested-list board runner.py uses.
+    """
+    x, o = board
+    rows = [[EMPTY, EMPTY, EMPTY] for _ in range(3)]
+    for index, (i, j) in enumerate(CELLS):
+        if x >> index & 1:
+            rows[i][j] = X
+        elif o >> index & 1:
+            rows[i][j] = O
+    return rows
+
+
+def transform(board, symmetry):
+    """
+    Returns the board mapped through one of the eight SYMMETRIES.
+    """
+    table = _MASK_TABLES[symmetry]
+    return (table[board[0]], table[board[1]])
+
+
+def transform_action(action, symmetry):
+    """
+    Returns where action (i, j) lands under one of the eight SYMMETRIES.
+    """
+    return CELLS[SYMMETRIES[symmetry][3 * action[0] + action[1]]]
+
+
+def canonical(board):
+    """
+    Returns (canonical_board, symmetry): the smallest of the board's eight
+    symmetric images and the symmetry that produces it. Boards that are
+    rotations or reflections of each other share a canonical board.
+    """
+    x, o = board
+    best = None
+    best_symmetry = 0
+    for symmetry, table in enumerate(_MASK_TABLES):
+        image = (table[x], table[o])
+        if best is None or image < best:
+            best = image
+            best_symmetry = symmetry
+    return best, best_symmetry
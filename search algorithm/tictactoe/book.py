@@ -0,0 +1,126 @@
+"""
+Precomputed perfect-play table for 3x3 Tic Tac Toe.
+
+Every board is numbered by reading its squares as base-3 digits
+(EMPTY = 0, X = 1, O = 2, square (i, j) weighing 3 ** (3 * i + j)), so
+the whole game fits in 3 ** 9 = 19683 entries. Each reachable entry is
+one byte: the best square 3 * i + j in the low four bits (NO_MOVE on
+finished boards) and the game value + 1 in the next two. Unreachable
+boards are UNREACHABLE.
+
+The file is MAGIC followed by the raw table. Build it once with
+
+    python book.py [path]
+
+and minimax answers every position with a single array lookup.
+"""
+
+import os
+import sys
+
+import bitboard
+
+MAGIC = b"TTTBOOK2"
+SIZE = 3 ** 9
+NO_MOVE = 0x0F
+UNREACHABLE = 0xFF
+
+# base-3 weight of every 9-bit mask, so index() is two table lookups
+_WEIGHTS = [sum(3 ** index for index in range(9) if mask >> index & 1)
+            for mask in range(bitboard.FULL + 1)]
+
+
+def book_path():
+    """
+    Returns the default location of the book, next to this module.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "tictactoe.book")
+
+
+def index(state):
+    """
+    Returns the base-3 position index of an (x, o) bitboard.
+    """
+    return _WEIGHTS[state[0]] + 2 * _WEIGHTS[state[1]]
+
+
+def reachable():
+    """
+    Yields every (x, o) bitboard reachable from the empty board.
+    """
+    seen = set()
+    stack = [bitboard.initial_state()]
+    while stack:
+        state = stack.pop()
+        if state in seen:
+            continue
+        seen.add(state)
+        yield state
+        if not bitboard.terminal(state):
+            for action in bitboard.actions(state):
+                stack.append(bitboard.result(state, action))
+
+
+def build(path=None):
+    """
+    Solves every reachable position and writes the book to `path`
+    atomically. Returns the table.
+    """
+    # imported here because tictactoe itself reads the book
+    import tictactoe
+
+    tictactoe.warm_up()
+    table = bytearray([UNREACHABLE]) * SIZE
+    for state in reachable():
+        board = bitboard.to_board(state)
+        action, value, _ = tictactoe.solve(board, use_book=False)
+        move = NO_MOVE if action is None else 3 * action[0] + action[1]
+        table[index(state)] = (value + 1) << 4 | move
+
+    path = path or book_path()
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(table)
+    os.replace(tmp, path)
+    return bytes(table)
+
+
+def load(path=None):
+    """
+    Returns the table stored at `path`, or None if it is missing or not
+    a book.
+    """
+    try:
+        with open(path or book_path(), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if data[:len(MAGIC)] != MAGIC or len(data) != len(MAGIC) + SIZE:
+        return None
+    return data[len(MAGIC):]
+
+
+def lookup(table, state):
+    """
+    Returns (action, value) for an (x, o) bitboard, or None if the
+    position cannot arise in a game.
+    """
+    entry = table[index(state)]
+    if entry == UNREACHABLE:
+        return None
+    move = entry & 0x0F
+    action = None if move == NO_MOVE else bitboard.CELLS[move]
+    return action, (entry >> 4) - 1
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else book_path()
+    table = build(path)
+    count = sum(entry != UNREACHABLE for entry in table)
+    print(f"Wrote {count} positions to {path}")
+
+
+if __name__ == "__main__":
+    main()
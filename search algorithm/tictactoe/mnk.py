@@ -0,0 +1,347 @@
+"""
+Generalized m,n,k game: an m x n board where k in a row wins.
+
+Tic Tac Toe is Board(3, 3, 3); Board(4, 4, 4), Board(5, 5, 4) and
+Board(15, 15, 5) (gomoku) use the same code. Boards are too large for
+an exhaustive minimax, so search() runs iterative-deepening alpha-beta
+with a pluggable evaluation function and a per-move time budget, and
+returns the best move from the deepest search that finished in time.
+
+Wins are detected incrementally: after each move only the four lines
+through that square are scanned.
+"""
+
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# scores beyond this are forced wins or losses rather than evaluations
+WIN = 1000000
+
+# (row, column) steps for the four line directions
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+_WINDOWS = {}
+_CENTER_ORDER = {}
+
+
+class Board():
+    def __init__(self, rows=3, cols=3, k=3):
+        if k > max(rows, cols):
+            raise ValueError(f"no line of {k} fits on a {rows}x{cols} board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = [EMPTY] * (rows * cols)
+        # squares played so far, as flat indexes, in order
+        self.moves = []
+        self.won = None
+
+    @classmethod
+    def from_board(cls, board, k=None):
+        """
+        Builds a Board from a nested-list board like runner.py uses. The
+        win length defaults to the board's smaller side.
+        """
+        rows = len(board)
+        cols = len(board[0])
+        game = cls(rows, cols, k or min(rows, cols))
+        # the order stones were played is unknown, so the history lists
+        # them row by row and cannot be undone past this position
+        for i in range(rows):
+            for j in range(cols):
+                if board[i][j] is not EMPTY:
+                    index = i * cols + j
+                    game.cells[index] = board[i][j]
+                    game.moves.append(index)
+        if game.cells.count(X) - game.cells.count(O) not in (0, 1):
+            raise ValueError("X and O move counts are out of turn")
+        for index in game.moves:
+            if game._completes_line(index, game.cells[index]):
+                game.won = game.cells[index]
+                break
+        return game
+
+    def to_board(self):
+        """
+        Returns the position as a nested list of X, O and EMPTY.
+        """
+        return [self.cells[i * self.cols:(i + 1) * self.cols]
+                for i in range(self.rows)]
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.rows = self.rows
+        board.cols = self.cols
+        board.k = self.k
+        board.cells = list(self.cells)
+        board.moves = list(self.moves)
+        board.won = self.won
+        return board
+
+    def player(self):
+        """
+        Returns player who has the next turn on the board.
+        """
+        return X if len(self.moves) % 2 == 0 else O
+
+    def actions(self):
+        """
+        Returns the list of all empty squares (i, j), in row-major order.
+        """
+        cols = self.cols
+        return [divmod(index, cols)
+                for index, cell in enumerate(self.cells) if cell is EMPTY]
+
+    def result(self, action):
+        """
+        Returns a new board with move (i, j) made on it.
+        """
+        board = self.copy()
+        board.play(action)
+        return board
+
+    def play(self, action):
+        """
+        Makes move (i, j) in place for the player to move.
+        """
+        i, j = action
+        if not (0 <= i < self.rows and 0 <= j < self.cols):
+            raise ValueError(f"move {action} is off the board")
+        index = i * self.cols + j
+        if self.cells[index] is not EMPTY or self.won is not None:
+            raise ValueError(f"move {action} is not legal")
+        self._play(index)
+
+    def undo(self):
+        """
+        Takes back the last move.
+        """
+        self.cells[self.moves.pop()] = EMPTY
+        self.won = None
+
+    def _play(self, index):
+        mark = X if len(self.moves) % 2 == 0 else O
+        self.cells[index] = mark
+        self.moves.append(index)
+        if self._completes_line(index, mark):
+            self.won = mark
+
+    def _completes_line(self, index, mark):
+        """
+        Returns True if `mark` at `index` lies on k in a row. Only the four
+        lines through this square can have changed.
+        """
+        cells = self.cells
+        rows, cols, k = self.rows, self.cols, self.k
+        i, j = divmod(index, cols)
+        for di, dj in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = i + sign * di, j + sign * dj
+                while (0 <= r < rows and 0 <= c < cols
+                       and cells[r * cols + c] == mark):
+                    count += 1
+                    r += sign * di
+                    c += sign * dj
+            if count >= k:
+                return True
+        return False
+
+    def winner(self):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        return self.won
+
+    def terminal(self):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.won is not None or len(self.moves) == len(self.cells)
+
+    def utility(self):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        if self.won == X:
+            return 1
+        if self.won == O:
+            return -1
+        return 0
+
+    def windows(self):
+        """
+        Returns every run of k squares that could hold a winning line,
+        as tuples of flat indexes. Shared by boards of the same shape.
+        """
+        key = (self.rows, self.cols, self.k)
+        if key not in _WINDOWS:
+            rows, cols, k = key
+            windows = []
+            for i in range(rows):
+                for j in range(cols):
+                    for di, dj in DIRECTIONS:
+                        end_i = i + (k - 1) * di
+                        end_j = j + (k - 1) * dj
+                        if 0 <= end_i < rows and 0 <= end_j < cols:
+                            windows.append(tuple(
+                                (i + step * di) * cols + j + step * dj
+                                for step in range(k)))
+            _WINDOWS[key] = windows
+        return _WINDOWS[key]
+
+    def candidates(self, radius=2):
+        """
+        Returns the empty squares worth searching as flat indexes, nearest
+        to the center first. With a radius, only squares within that many
+        steps of an existing stone are returned (the center alone on an
+        empty board); with radius=None every empty square is.
+        """
+        key = (self.rows, self.cols)
+        if key not in _CENTER_ORDER:
+            rows, cols = key
+            _CENTER_ORDER[key] = sorted(
+                range(rows * cols),
+                key=lambda index: (abs(index // cols - (rows - 1) / 2)
+                                   + abs(index % cols - (cols - 1) / 2),
+                                   index))
+        order = _CENTER_ORDER[key]
+        cells = self.cells
+        if radius is None or not self.moves:
+            empty = [index for index in order if cells[index] is EMPTY]
+            return empty if radius is None else empty[:1]
+
+        cols = self.cols
+        near = set()
+        for index in self.moves:
+            i, j = divmod(index, cols)
+            for r in range(max(0, i - radius), min(self.rows, i + radius + 1)):
+                for c in range(max(0, j - radius), min(cols, j + radius + 1)):
+                    near.add(r * cols + c)
+        found = [index for index in order
+                 if index in near and cells[index] is EMPTY]
+        # every square near a stone is taken: fall back to the rest
+        return found or [index for index in order if cells[index] is EMPTY]
+
+
+def line_evaluation(board):
+    """
+    Scores a position from X's point of view by its open lines: every
+    window of k squares holding only one player's stones is worth
+    10 ** stones to that player.
+    """
+    cells = board.cells
+    score = 0
+    for window in board.windows():
+        xs = os = 0
+        for index in window:
+            cell = cells[index]
+            if cell is X:
+                xs += 1
+            elif cell is O:
+                os += 1
+        if xs and not os:
+            score += 10 ** xs
+        elif os and not xs:
+            score -= 10 ** os
+    return score
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class _Search():
+    def __init__(self, evaluate, radius, deadline):
+        self.evaluate = evaluate
+        self.radius = radius
+        self.deadline = deadline
+        self.nodes = 0
+
+    def negamax(self, board, depth, alpha, beta, ply):
+        """
+        Returns the value of the board for the player to move.
+        """
+        self.nodes += 1
+        if self.nodes % 128 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        if board.won is not None:
+            # the previous move won; sooner wins score higher
+            return -(WIN - ply)
+        if len(board.moves) == len(board.cells):
+            return 0
+        if depth == 0:
+            value = self.evaluate(board)
+            return value if len(board.moves) % 2 == 0 else -value
+
+        best = -math.inf
+        for index in board.candidates(self.radius):
+            board._play(index)
+            try:
+                value = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.undo()
+            if value > best:
+                best = value
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+        return best
+
+
+def search(board, time_budget=1.0, max_depth=None, evaluate=line_evaluation,
+           radius=2):
+    """
+    Returns (action, value, depth) for the player to move: the best move
+    found by iterative-deepening alpha-beta within `time_budget` seconds,
+    its value for that player (beyond +-WIN/2 means a forced win or loss)
+    and the deepest search that completed.
+
+    `evaluate(board)` scores non-terminal leaves from X's point of view.
+    Candidate moves are limited to squares within `radius` of a stone;
+    radius=None searches every empty square.
+    """
+    if board.terminal():
+        return None, board.utility() * WIN, 0
+
+    board = board.copy()
+    order = board.candidates(radius)
+    remaining = len(board.cells) - len(board.moves)
+    if max_depth is None:
+        max_depth = remaining
+
+    context = _Search(evaluate, radius, time.perf_counter() + time_budget)
+    best = (divmod(order[0], board.cols), 0, 0)
+    for depth in range(1, max_depth + 1):
+        try:
+            value, index = _search_root(board, order, depth, context)
+        except SearchTimeout:
+            break
+        best = (divmod(index, board.cols), value, depth)
+        # search the best move first on the next, deeper iteration
+        order.remove(index)
+        order.insert(0, index)
+        if abs(value) > WIN // 2 or depth >= remaining:
+            break
+    return best
+
+
+def _search_root(board, order, depth, context):
+    alpha = -math.inf
+    best_index = order[0]
+    for index in order:
+        board._play(index)
+        try:
+            value = -context.negamax(board, depth - 1, -math.inf, -alpha, 1)
+        finally:
+            board.undo()
+        if value > alpha:
+            alpha = value
+            best_index = index
+    return alpha, best_index
@@ -3,6 +3,7 @@ import sys
 import time
 
 import tictactoe as ttt
+from ai import MoveWorker
 
 pygame.init()
 size = width, height = 600, 400
@@ -19,12 +20,16 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# the AI searches in the background so the window keeps responding
+ai_worker = MoveWorker()
+ai_move = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            ai_worker.shutdown()
             sys.exit()
 
     screen.fill(black)
@@ -102,7 +107,8 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = "." * (int(time.time() * 3) % 3 + 1)
+            title = f"Computer thinking{dots:<3}"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
@@ -110,13 +116,11 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_move = ai_worker.request(board)
+            elif ai_move.done():
+                board = ttt.result(board, ai_move.result())
+                ai_move = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +145,7 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    ai_worker.cancel()
+                    ai_move = None
 
     pygame.display.flip()
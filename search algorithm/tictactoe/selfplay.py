@@ -0,0 +1,175 @@
+"""
+Headless self-play harness for Tic Tac Toe agents.
+
+Plays many games between two agents without pygame, spread across a
+process pool, and prints one JSON object with throughput (games/sec),
+work per move (nodes searched and seconds) for each side, and outcome
+counts.
+
+Agents:
+    minimax    full game-tree search (no pruning, table or book)
+    alphabeta  alpha-beta search without the table or book
+    table      default minimax: book, then transposition table, then search
+    random     a uniformly random legal move
+
+Perfect agents should never lose from the empty board; with no random
+openings, every game one of them loses is counted in "perfect_losses".
+
+Usage: python selfplay.py [--x AGENT] [--o AGENT] [--games N]
+                          [--workers N] [--openings N] [--seed N]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import tictactoe as ttt
+
+
+def _searcher(pruning, use_table, use_book):
+    def agent(board, rng):
+        move, _, stats = ttt.solve(board, pruning, use_table, use_book)
+        return move, stats.nodes
+    return agent
+
+
+def random_agent(board, rng):
+    return rng.choice(ttt.actions(board)), 0
+
+
+AGENTS = {
+    "minimax": _searcher(pruning=False, use_table=False, use_book=False),
+    "alphabeta": _searcher(pruning=True, use_table=False, use_book=False),
+    "table": _searcher(pruning=True, use_table=True, use_book=True),
+    "random": random_agent,
+}
+PERFECT = {"minimax", "alphabeta", "table"}
+
+
+def play_game(agents, rng, openings=0):
+    """
+    Plays one game between agents {X: agent, O: agent}, with the first
+    `openings` moves made at random. Returns (winner, moves), where moves
+    holds (player, nodes, seconds) for every move an agent chose.
+    """
+    board = ttt.initial_state()
+    moves = []
+    ply = 0
+    while not ttt.terminal(board):
+        player = ttt.player(board)
+        if ply < openings:
+            move = rng.choice(ttt.actions(board))
+        else:
+            start = time.perf_counter()
+            move, nodes = agents[player](board, rng)
+            moves.append((player, nodes, time.perf_counter() - start))
+        if move not in ttt.actions(board):
+            raise Exception(f"{player} chose illegal move {move}")
+        board = ttt.result(board, move)
+        ply += 1
+    return ttt.winner(board), moves
+
+
+def play_games(x_agent, o_agent, games, seed=0, openings=0):
+    """
+    Plays `games` games between named agents and returns their tallies.
+    """
+    agents = {ttt.X: AGENTS[x_agent], ttt.O: AGENTS[o_agent]}
+    rng = random.Random(seed)
+    tally = {
+        "outcomes": {ttt.X: 0, ttt.O: 0, "draw": 0},
+        "moves": {ttt.X: 0, ttt.O: 0},
+        "nodes": {ttt.X: 0, ttt.O: 0},
+        "seconds": {ttt.X: 0.0, ttt.O: 0.0},
+    }
+    for _ in range(games):
+        winner, moves = play_game(agents, rng, openings)
+        tally["outcomes"][winner or "draw"] += 1
+        for player, nodes, seconds in moves:
+            tally["moves"][player] += 1
+            tally["nodes"][player] += nodes
+            tally["seconds"][player] += seconds
+    return tally
+
+
+def run(x_agent, o_agent, games=1000, workers=1, seed=0, openings=0):
+    """
+    Plays the games across `workers` processes and returns the result
+    dict.
+    """
+    workers = max(1, min(workers, games))
+    # one chunk per worker, each with its own seed
+    chunks = [games // workers + (i < games % workers)
+              for i in range(workers)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        tallies = [play_games(x_agent, o_agent, games, seed, openings)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            tallies = list(pool.map(
+                play_games, [x_agent] * workers, [o_agent] * workers,
+                chunks, [seed + i for i in range(workers)],
+                [openings] * workers))
+    elapsed = time.perf_counter() - start
+
+    total = tallies[0]
+    for tally in tallies[1:]:
+        for field, counts in tally.items():
+            for key, value in counts.items():
+                total[field][key] += value
+
+    outcomes = total["outcomes"]
+    players = {}
+    for player, name in ((ttt.X, x_agent), (ttt.O, o_agent)):
+        moves = total["moves"][player]
+        players[player] = {
+            "agent": name,
+            "moves": moves,
+            "nodes_per_move": total["nodes"][player] / moves if moves else 0,
+            "ms_per_move":
+                total["seconds"][player] * 1000 / moves if moves else 0,
+        }
+    # random openings can hand a perfect agent a lost position
+    perfect_losses = None
+    if openings == 0:
+        perfect_losses = sum(
+            outcomes[other]
+            for player, other in ((ttt.X, ttt.O), (ttt.O, ttt.X))
+            if players[player]["agent"] in PERFECT)
+
+    return {
+        "games": games,
+        "workers": workers,
+        "openings": openings,
+        "seed": seed,
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed else None,
+        "outcomes": {"X": outcomes[ttt.X], "O": outcomes[ttt.O],
+                     "draw": outcomes["draw"]},
+        "players": players,
+        "perfect_losses": perfect_losses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic Tac Toe self-play.")
+    parser.add_argument("--x", choices=sorted(AGENTS), default="table")
+    parser.add_argument("--o", choices=sorted(AGENTS), default="random")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--openings", type=int, default=0,
+                        help="random moves at the start of every game")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run(args.x, args.o, args.games, args.workers, args.seed,
+                 args.openings)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
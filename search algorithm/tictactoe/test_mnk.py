@@ -0,0 +1,59 @@
+"""
+Checks mnk.search on 3x3 against tictactoe.solve on every reachable
+position, and the m,n,k rules against the tictactoe ones.
+
+Usage: python -m unittest test_mnk
+"""
+
+import unittest
+
+import mnk
+import tictactoe as ttt
+from test_tictactoe import positions
+
+
+class MnkTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.positions = positions()
+
+    def test_rules(self):
+        for board in self.positions:
+            game = mnk.Board.from_board(board)
+            self.assertEqual(game.player(), ttt.player(board))
+            self.assertEqual(game.actions(), ttt.actions(board))
+            self.assertFalse(game.terminal())
+            for action in game.actions():
+                child = game.result(action)
+                expected = ttt.result(board, action)
+                self.assertEqual(child.to_board(), expected)
+                self.assertEqual(child.terminal(), ttt.terminal(expected))
+                if child.terminal():
+                    self.assertEqual(child.utility(), ttt.utility(expected))
+
+    def test_search(self):
+        # a full-depth search must find the game value and an optimal move
+        for board in self.positions:
+            action, value, _ = mnk.search(mnk.Board.from_board(board),
+                                          time_budget=60, radius=None)
+            expected = ttt.solve(board, instrument=False)[1]
+            sign = 1 if ttt.player(board) == ttt.X else -1
+            if expected == 0:
+                self.assertEqual(value, 0, board)
+            else:
+                self.assertGreater(value * expected * sign, mnk.WIN // 2,
+                                   board)
+            child = ttt.result(board, action)
+            self.assertEqual(ttt.solve(child, instrument=False)[1], expected,
+                             board)
+
+    def test_larger_boards(self):
+        for rows, cols, k in ((4, 4, 4), (5, 5, 4), (15, 15, 5)):
+            game = mnk.Board(rows, cols, k)
+            action, _, depth = mnk.search(game, time_budget=0.2)
+            self.assertIn(action, game.actions())
+            self.assertGreaterEqual(depth, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Checks minimax against a plain reference search on every reachable
+position: the same value and, in every mode, the same move.
+
+Usage: python -m unittest test_tictactoe
+"""
+
+import os
+import tempfile
+import unittest
+
+import bitboard
+import book
+import tictactoe as ttt
+
+
+def reference(board, memo={}):
+    """
+    Returns (action, value) from an exhaustive search on nested lists: the
+    first row-major action with the best value, as minimax has always
+    chosen.
+    """
+    key = str(board)
+    if key not in memo:
+        if ttt.terminal(board):
+            memo[key] = (None, ttt.utility(board))
+        else:
+            sign = 1 if ttt.player(board) == ttt.X else -1
+            best = None
+            for action in ttt.actions(board):
+                value = reference(ttt.result(board, action))[1]
+                if best is None or value * sign > best[1] * sign:
+                    best = (action, value)
+            memo[key] = best
+    return memo[key]
+
+
+def positions():
+    """
+    Returns every reachable position that is not over, as nested lists.
+    """
+    return [bitboard.to_board(state) for state in book.reachable()
+            if not bitboard.terminal(state)]
+
+
+class BitboardTest(unittest.TestCase):
+    def test_rules(self):
+        # the bitboard engine agrees with the list-board functions
+        for state in book.reachable():
+            board = bitboard.to_board(state)
+            self.assertEqual(bitboard.from_board(board), state)
+            self.assertEqual(bitboard.terminal(state), ttt.terminal(board))
+            if ttt.terminal(board):
+                self.assertEqual(bitboard.utility(state), ttt.utility(board))
+                self.assertEqual(bitboard.winner(state), ttt.winner(board))
+                continue
+            self.assertEqual(bitboard.player(state), ttt.player(board))
+            self.assertEqual(bitboard.actions(state), ttt.actions(board))
+            for action in ttt.actions(board):
+                self.assertEqual(
+                    bitboard.to_board(bitboard.result(state, action)),
+                    ttt.result(board, action))
+
+    def test_symmetries(self):
+        for state in book.reachable():
+            canonical, symmetry = bitboard.canonical(state)
+            self.assertEqual(
+                bitboard.transform(canonical, bitboard.INVERSE[symmetry]),
+                state)
+
+
+class MinimaxTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.positions = positions()
+
+    def setUp(self):
+        ttt.TABLE.clear()
+
+    def check(self, **options):
+        for board in self.positions:
+            action, value, _ = ttt.solve(board, use_book=False, **options)
+            self.assertEqual((action, value), reference(board), board)
+
+    def test_reachable_count(self):
+        self.assertEqual(len(self.positions), 4520)
+
+    def test_full_search(self):
+        self.check(pruning=False, use_table=False)
+
+    def test_alpha_beta(self):
+        self.check(use_table=False)
+
+    def test_table(self):
+        self.check()
+
+    def test_table_without_pruning(self):
+        self.check(pruning=False)
+
+    def test_warm_table(self):
+        # every answer comes from stored values, not a fresh search
+        ttt.warm_up()
+        self.check()
+
+    def test_minimax(self):
+        for board in self.positions:
+            self.assertEqual(ttt.minimax(board, use_book=False),
+                             reference(board)[0])
+
+    def test_book(self):
+        # the book stores the move minimax would have searched for
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tictactoe.book")
+            table = book.build(path)
+            self.assertEqual(book.load(path), table)
+        for board in self.positions:
+            self.assertEqual(book.lookup(table, bitboard.from_board(board)),
+                             reference(board))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,8 +4,12 @@ Tic Tac Toe Player
 
 import math
 import copy
+import time
 from itertools import chain
 
+import bitboard
+import book
+
 
 X = "X"
 O = "O"
@@ -135,56 +139,348 @@ def utility(board):
     return 0
 
 
-def minimax(board):
+# center first, then corners, then edges: the strongest squares are
+# searched first so alpha-beta cuts off the rest sooner
+ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1)]
+ORDERED_BITS = [bitboard.BITS[cell] for cell in ORDER]
+
+
+# transposition table entry flags: the stored value is exact, or only a
+# lower / upper bound because the search that produced it was cut off
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# canonical board -> (value, flag, best action on the canonical board),
+# shared by every search for the life of the process
+TABLE = {}
+
+# the solved-game table written by book.py, read on first use;
+# None once it has been looked for and not found
+BOOK = None
+_book_checked = False
+
+
+class SearchStats():
+    """
+    Counters collected during one minimax search: positions visited in
+    total and at each ply below the root, terminal positions scored,
+    alpha-beta cutoffs, transposition table and book hits, and the wall
+    time of the whole call.
+    """
+    def __init__(self):
+        self.nodes = 0
+        # depth_nodes[d] = positions visited d moves below the root
+        self.depth_nodes = []
+        self.terminal = 0
+        self.cutoffs = 0
+        self.table_hits = 0
+        self.book_hits = 0
+        self.seconds = 0.0
+
+    def visit(self, depth):
+        self.nodes += 1
+        if depth < len(self.depth_nodes):
+            self.depth_nodes[depth] += 1
+        else:
+            self.depth_nodes.append(1)
+
+    @property
+    def max_depth(self):
+        return len(self.depth_nodes) - 1
+
+    def as_dict(self):
+        return {
+            "nodes": self.nodes,
+            "depth_nodes": list(self.depth_nodes),
+            "max_depth": self.max_depth,
+            "terminal": self.terminal,
+            "cutoffs": self.cutoffs,
+            "table_hits": self.table_hits,
+            "book_hits": self.book_hits,
+            "seconds": self.seconds,
+        }
+
+
+def minimax(board, pruning=True, use_table=True, use_book=True):
     """
     Returns the optimal action for the current player on the board.
     """
+    return solve(board, pruning, use_table, use_book, instrument=False)[0]
+
+
+def get_book():
+    """
+    Returns the solved-game table from book.py, loading it on first use,
+    or None if it has not been built.
+    """
+    global BOOK, _book_checked
+    if not _book_checked:
+        BOOK = book.load()
+        _book_checked = True
+    return BOOK
+
+
+def solve(board, pruning=True, use_table=True, use_book=True,
+          instrument=True, callback=None):
+    """
+    Returns (action, value, stats) for the current player on the board,
+    where value is the game value under perfect play and stats is the
+    SearchStats of the call. With pruning=False the full game tree is
+    searched.
+
+    With use_table, positions are solved once in their canonical
+    orientation and remembered in TABLE, so repeated and symmetric
+    positions are answered by lookups. The move is still the first
+    optimal one in row-major order, as without the table. With use_book, positions found in the
+    table built by book.py are answered from it without searching.
+
+    With instrument=False nothing is counted and stats is None, unless a
+    `callback` is given: it is called with the stats once the search is
+    done.
+    """
+    stats = None
+    if instrument or callback is not None:
+        stats = SearchStats()
+        started = time.perf_counter()
 
+    action, value = _solve(board, pruning, use_table, use_book, stats)
+
+    if stats is not None:
+        stats.seconds = time.perf_counter() - started
+        if callback is not None:
+            callback(stats)
+    return action, value, stats
+
+
+def _solve(board, pruning, use_table, use_book, stats):
     # NOTE: I fixed the code for minimax on the ed forum https://us.edstem.org/courses/241/discussion/37176 and hence modified used it in my code but built off of the logic
 
     # if the game has ended return none
     if terminal(board):
-        return None
+        return None, utility(board)
+
+    # search on the compact bitboard instead of copying nested lists
+    state = bitboard.from_board(board)
+
+    if use_book and get_book() is not None:
+        found = book.lookup(BOOK, state)
+        if found is not None:
+            if stats is not None:
+                stats.book_hits += 1
+            return found
+
+    if not use_table:
+        # the root keeps row-major order and takes the first strictly
+        # better move, so ties are broken the same way with and without
+        # pruning
+        return _search_root(state, bitboard.actions(state), pruning, stats,
+                            None)
+
+    # the table only settles the root's value; the move is then the first
+    # row-major child reaching it, the same move as without the table
+    canonical = bitboard.canonical(state)[0]
+    entry = TABLE.get(canonical)
+    if entry is not None and entry[1] == EXACT:
+        if stats is not None:
+            stats.table_hits += 1
+        value = entry[0]
+    else:
+        # same order as inner nodes so a position's stored move does not
+        # depend on whether it was first solved at the root or below it
+        actions = [bitboard.CELLS[bit.bit_length() - 1]
+                   for bit in ORDERED_BITS
+                   if not (canonical[0] | canonical[1]) & bit]
+        best_move, value = _search_root(canonical, actions, pruning, stats,
+                                        TABLE)
+        TABLE[canonical] = (value, EXACT, best_move)
+    return _first_move(state, value, pruning, stats), value
+
+
+def _search_root(state, actions, pruning, stats, table):
+    """
+    Returns (action, value) for the first of `actions` with the best
+    value.
+    """
+    x, o = state
+    if stats is not None:
+        stats.visit(0)
 
-    # otherwise apply minimax algorithm as shown in class
-    if player(board) == X:
-        best_o_move = -1
+    # children only need to beat the best value so far
+    if bitboard.player(state) == X:
+        best_value = -math.inf
         best_move = None
-        for action in actions(board):
-            value = min_value(result(board, action))
-            if value > best_o_move:
-                best_o_move = value
+        for action in actions:
+            bit = bitboard.BITS[action]
+            value = _min_value((x | bit, o), best_value, math.inf,
+                               pruning, stats, table, 1)
+            if value > best_value:
+                best_value = value
                 best_move = action
-
-        return best_move
+            if pruning and best_value == 1:
+                break
     else:
-        best_x_move = 1
+        best_value = math.inf
         best_move = None
-        for action in actions(board):
-            value = max_value(result(board, action))
-            if value < best_x_move:
-                best_x_move = value
+        for action in actions:
+            bit = bitboard.BITS[action]
+            value = _max_value((x, o | bit), -math.inf, best_value,
+                               pruning, stats, table, 1)
+            if value < best_value:
+                best_value = value
                 best_move = action
-        return best_move
+            if pruning and best_value == -1:
+                break
+    return best_move, best_value
 
 
-def max_value(board):
-    if terminal(board):
-        return utility(board)
+def _first_move(state, value, pruning, stats):
+    """
+    Returns the first action in row-major order whose child has the root's
+    exact `value`, reading children from TABLE where it settles them.
+    """
+    x, o = state
+    for action in bitboard.actions(state):
+        bit = bitboard.BITS[action]
+        # a window just past `value` only tells "reaches it" from "does not"
+        if bitboard.player(state) == X:
+            child = _min_value((x | bit, o), value - 1, math.inf,
+                               pruning, stats, TABLE, 1)
+        else:
+            child = _max_value((x, o | bit), -math.inf, value + 1,
+                               pruning, stats, TABLE, 1)
+        if child == value:
+            return action
 
-    v = -math.inf
 
-    for action in actions(board):
-        v = max(v, min_value(result(board, action)))
+def warm_up():
+    """
+    Solves every reachable position into TABLE, so that from then on every
+    minimax call is a single table lookup.
+    """
+    solve(initial_state(), pruning=False, instrument=False)
 
-    return v
+
+def max_value(board):
+    return _max_value(bitboard.from_board(board), -math.inf, math.inf,
+                      True, None, TABLE, 0)
 
 
 def min_value(board):
-    if terminal(board):
-        return utility(board)
+    return _min_value(bitboard.from_board(board), -math.inf, math.inf,
+                      True, None, TABLE, 0)
+
+
+# stats is None when the search is not instrumented, so every counter
+# update is guarded and an uninstrumented search does no counting work
+def _max_value(state, alpha, beta, pruning, stats, table, depth):
+    if stats is not None:
+        stats.visit(depth)
+    if bitboard.terminal(state):
+        if stats is not None:
+            stats.terminal += 1
+        return bitboard.utility(state)
+    if not pruning:
+        # exact values only, so table entries are never mistaken for bounds
+        alpha, beta = -math.inf, math.inf
+
+    if table is not None:
+        state = bitboard.canonical(state)[0]
+        value = _probe(table, state, alpha, beta, stats)
+        if value is not None:
+            return value
+        start_alpha = alpha
+
+    x, o = state
+    occupied = x | o
+    v = -math.inf
+    best_bit = None
+    for bit in ORDERED_BITS:
+        if occupied & bit:
+            continue
+        value = _min_value((x | bit, o), alpha, beta, pruning, stats, table,
+                           depth + 1)
+        if value > v:
+            v = value
+            best_bit = bit
+        if pruning:
+            if v >= beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                break
+            alpha = max(alpha, v)
+
+    if table is not None:
+        _store(table, state, v, start_alpha, beta, best_bit)
+    return v
+
 
+def _min_value(state, alpha, beta, pruning, stats, table, depth):
+    if stats is not None:
+        stats.visit(depth)
+    if bitboard.terminal(state):
+        if stats is not None:
+            stats.terminal += 1
+        return bitboard.utility(state)
+    if not pruning:
+        # exact values only, so table entries are never mistaken for bounds
+        alpha, beta = -math.inf, math.inf
+
+    if table is not None:
+        state = bitboard.canonical(state)[0]
+        value = _probe(table, state, alpha, beta, stats)
+        if value is not None:
+            return value
+        start_beta = beta
+
+    x, o = state
+    occupied = x | o
     v = math.inf
-    for action in actions(board):
-        v = min(v, max_value(result(board, action)))
+    best_bit = None
+    for bit in ORDERED_BITS:
+        if occupied & bit:
+            continue
+        value = _max_value((x, o | bit), alpha, beta, pruning, stats, table,
+                           depth + 1)
+        if value < v:
+            v = value
+            best_bit = bit
+        if pruning:
+            if v <= alpha:
+                if stats is not None:
+                    stats.cutoffs += 1
+                break
+            beta = min(beta, v)
+
+    if table is not None:
+        _store(table, state, v, alpha, start_beta, best_bit)
     return v
+
+
+def _probe(table, state, alpha, beta, stats):
+    """
+    Returns the stored value of a canonical state if it settles the search
+    within (alpha, beta), otherwise None.
+    """
+    entry = table.get(state)
+    if entry is None:
+        return None
+    value, flag, _ = entry
+    if (flag == EXACT or (flag == LOWER and value >= beta)
+            or (flag == UPPER and value <= alpha)):
+        if stats is not None:
+            stats.table_hits += 1
+        return value
+    return None
+
+
+def _store(table, state, value, alpha, beta, best_bit):
+    if value <= alpha:
+        flag = UPPER
+    elif value >= beta:
+        flag = LOWER
+    else:
+        flag = EXACT
+    # never replace an exact entry with a bound
+    entry = table.get(state)
+    if entry is not None and entry[1] == EXACT and flag != EXACT:
+        return
+    table[state] = (value, flag, bitboard.CELLS[best_bit.bit_length() - 1])